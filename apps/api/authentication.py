@@ -0,0 +1,55 @@
+import hmac
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from drf_spectacular.extensions import OpenApiAuthenticationExtension
+from drf_spectacular.plumbing import build_bearer_security_scheme_object
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create authentication classes
+class ServiceTokenAuthentication(BaseAuthentication):
+    """
+    Authentication of internal services by "Authorization: Bearer <token>" header.
+    Tokens are configured in SERVICE_TOKENS, the service name is set as request.auth
+    """
+    keyword: str = 'Bearer'
+
+    def authenticate(self, request: Request) -> tuple[AnonymousUser, str] | None:
+        """
+        Authenticate the service by token
+        Args:
+            request: HTTP request
+        Returns:
+            anonymous user and service name or None if there is no token
+        """
+        header: list[bytes] = get_authorization_header(request).split()
+
+        if not header or header[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(header) != 2:
+            raise AuthenticationFailed('Invalid token header')
+
+        for service, token in settings.SERVICE_TOKENS.items():
+            if hmac.compare_digest(header[1], token.encode()):
+                return AnonymousUser(), service
+
+        raise AuthenticationFailed('Invalid token')
+
+    def authenticate_header(self, request: Request) -> str:
+        return self.keyword
+
+
+# ------------------------------------------------------------------------------
+class ServiceTokenScheme(OpenApiAuthenticationExtension):
+    """
+    OpenAPI security scheme of the ServiceTokenAuthentication
+    """
+    target_class: type = ServiceTokenAuthentication
+    name: str = 'serviceToken'
+
+    def get_security_definition(self, auto_schema) -> dict:
+        return build_bearer_security_scheme_object(header_name='Authorization', token_prefix='Bearer')
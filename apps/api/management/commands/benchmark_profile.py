@@ -0,0 +1,53 @@
+import timeit
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from rest_framework.renderers import JSONRenderer
+
+from apps.api.renderers import ORJSONRenderer
+from apps.api.v1.users.serializers import UserSerializer, UserProfileSerializer
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Get user model
+User = get_user_model()
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create commands
+class Command(BaseCommand):
+    """
+    Compare per-request serialization cost of the profile payload
+    """
+    help = 'Compare per-request serialization cost of the profile payload'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--phone-number', help='profile to serialize (first user by default)')
+        parser.add_argument('--number', type=int, default=1000, help='iterations per measurement')
+
+    def handle(self, *args, **options) -> None:
+        """
+        Run the microbenchmark and print results in microseconds per request
+        """
+        users = User.objects.order_by('id')
+        if options['phone_number']:
+            users = users.filter(phone_number=options['phone_number'])
+
+        user: User = users.first()
+        if not user:
+            raise CommandError('No user to serialize')
+
+        number: int = options['number']
+        json_renderer, orjson_renderer = JSONRenderer(), ORJSONRenderer()
+
+        if json_renderer.render(UserSerializer(user).data) != orjson_renderer.render(UserProfileSerializer(user).data):
+            raise CommandError('Fast path output differs from UserSerializer + JSONRenderer')
+
+        cases: dict = {
+            'UserSerializer + JSONRenderer': lambda: json_renderer.render(UserSerializer(user).data),
+            'UserProfileSerializer + JSONRenderer': lambda: json_renderer.render(UserProfileSerializer(user).data),
+            'UserProfileSerializer + ORJSONRenderer': lambda: orjson_renderer.render(UserProfileSerializer(user).data),
+        }
+
+        for name, case in cases.items():
+            seconds: float = min(timeit.repeat(case, number=number, repeat=5))
+            self.stdout.write(f'{name:<40} {seconds / number * 1_000_000:10.1f} us/request')
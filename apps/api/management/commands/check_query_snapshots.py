@@ -0,0 +1,363 @@
+import difflib
+import json
+import re
+import secrets
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern
+
+from apps.api.v1.users import urls as api_urls
+from apps.frontend.users import urls as frontend_urls
+from apps.users.otp import get_cache_key
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Get user model
+User = get_user_model()
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Snapshots of every vendor are checked in next to the api app
+SNAPSHOTS_DIR: Path = Path(__file__).resolve().parents[2] / 'query_snapshots'
+
+# Covered url modules with their prefixes
+URL_MODULES: dict[str, tuple] = {
+    'api': (api_urls, '/api/v1/users/'),
+    'frontend': (frontend_urls, '/'),
+}
+
+# Seeded users
+REFERRER_PHONE_NUMBER: str = '+79990000000'
+REFERRER_INVITE_CODE: str = 'REFER0'
+INVITEE_PHONE_NUMBER: str = '+79990000001'
+REFERRER_INVITED_USERS: int = 50
+
+SERVICE_TOKEN: str = secrets.token_urlsafe()
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create data classes
+@dataclass(frozen=True)
+class Scenario:
+    """
+    Request whose queries are recorded
+    """
+    name: str
+    url: str
+    method: str
+    data: dict = field(default_factory=dict)
+    user: str | None = None
+    headers: dict = field(default_factory=dict)
+    # Called with the client before the recorded request, returns extra data of the request
+    prepare: Callable[[Client], dict] | None = None
+    # Settings overridden for the preparation and the request
+    settings: dict = field(default_factory=dict)
+
+    def get_path(self) -> str:
+        """
+        Get request path from the url name
+        Returns:
+            string with path
+        """
+        module, name = self.url.split(':')
+        urls, prefix = URL_MODULES[module]
+        pattern: URLPattern = next(pattern for pattern in urls.urlpatterns if pattern.name == name)
+
+        return prefix + str(pattern.pattern)
+
+
+def _api_one_time_password(client: Client) -> dict:
+    response = client.post('/api/v1/users/login', {'phone_number': REFERRER_PHONE_NUMBER})
+
+    return {'password': response.json()['one_time_password']}
+
+
+def _frontend_one_time_password(client: Client) -> dict:
+    client.post('/', {'phone_number': REFERRER_PHONE_NUMBER})
+
+    return {'password': client.session['one_time_password']}
+
+
+def _api_challenge(client: Client) -> dict:
+    response = client.post('/api/v1/users/login', {'phone_number': REFERRER_PHONE_NUMBER})
+
+    return {'password': response.json()['one_time_password'], 'challenge': response.json()['challenge']}
+
+
+def _frontend_challenge(client: Client) -> dict:
+    response = client.post('/', {'phone_number': REFERRER_PHONE_NUMBER})
+
+    return {
+        'password': cache.get(get_cache_key(REFERRER_PHONE_NUMBER))['password'],
+        'challenge': re.search(r'name="challenge" value="([^"]+)"', response.content.decode())[1],
+    }
+
+
+SCENARIOS: tuple[Scenario, ...] = (
+    Scenario('api login', 'api:user-login', 'post', {'phone_number': REFERRER_PHONE_NUMBER}),
+    Scenario('api login challenge', 'api:user-login', 'post', {'phone_number': REFERRER_PHONE_NUMBER},
+             settings={'OTP_CHALLENGE_MODE': True}),
+    Scenario('api login new user', 'api:user-login', 'post', {'phone_number': '+79990000099'}),
+    Scenario('api authenticate', 'api:user-authenticate', 'post', prepare=_api_one_time_password),
+    Scenario('api authenticate challenge', 'api:user-authenticate', 'post', prepare=_api_challenge,
+             settings={'OTP_CHALLENGE_MODE': True}),
+    Scenario('api profile', 'api:user-profile', 'get', user='referrer', headers={'HTTP_ACCEPT': 'application/json'}),
+    Scenario('api profile invite', 'api:user-profile', 'put', {'invited_by_code': REFERRER_INVITE_CODE},
+             user='invitee'),
+    Scenario('api logout', 'api:user-profile', 'delete', user='referrer'),
+    Scenario('api lookup', 'api:user-lookup', 'post',
+             {'ids': list(range(1, 1001)), 'phone_numbers': [INVITEE_PHONE_NUMBER]},
+             headers={'HTTP_AUTHORIZATION': f'Bearer {SERVICE_TOKEN}'}),
+    Scenario('frontend login page', 'frontend:user-identify', 'get'),
+    Scenario('frontend login', 'frontend:user-identify', 'post', {'phone_number': REFERRER_PHONE_NUMBER}),
+    Scenario('frontend authenticate page', 'frontend:user-authenticate', 'get', prepare=_frontend_one_time_password),
+    Scenario('frontend authenticate', 'frontend:user-authenticate', 'post', prepare=_frontend_one_time_password),
+    Scenario('frontend authenticate challenge', 'frontend:user-authenticate', 'post', prepare=_frontend_challenge,
+             settings={'OTP_CHALLENGE_MODE': True}),
+    Scenario('frontend profile', 'frontend:user-profile', 'get', user='referrer'),
+    Scenario('frontend profile update', 'frontend:user-profile', 'post',
+             {'first_name': 'Name', 'last_name': 'Surname', 'email': 'user@example.com'}, user='referrer'),
+    Scenario('frontend invite', 'frontend:user-submit', 'post', {'invited_by_code': REFERRER_INVITE_CODE},
+             user='invitee'),
+    Scenario('frontend logout', 'frontend:user-logout', 'post', user='referrer'),
+)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create services
+def normalize_sql(sql: str) -> str:
+    """
+    Replace literals, IN lists and savepoint names so the SQL does not depend on data
+    Args:
+        sql: executed SQL
+    Returns:
+        normalized SQL
+    """
+    sql = re.sub(r'((?:RELEASE |ROLLBACK TO )?SAVEPOINT) "?\w+"?', r'\1 ?', sql)
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+
+    return re.sub(r'\bIN \((?:\?, )*\?\)', 'IN (...)', sql)
+
+
+def explain(sql: str) -> list[str]:
+    """
+    Get plan nodes of the statement
+    Args:
+        sql: executed SQL with parameters
+    Returns:
+        list of plan nodes or empty list if the vendor or statement is not supported
+    """
+    if not sql.startswith(('SELECT', 'UPDATE', 'DELETE')):
+        return []
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+            plan: dict = cursor.fetchone()[0][0]['Plan']
+            return list(_walk_postgresql_plan(plan))
+
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[3] for row in cursor.fetchall()]
+
+    return []
+
+
+def _walk_postgresql_plan(plan: dict) -> Iterator[str]:
+    """
+    Flatten PostgreSQL JSON plan into nodes
+    Args:
+        plan: plan node with subplans
+    Returns:
+        iterator over nodes with index and relation names
+    """
+    node: str = plan['Node Type']
+    if 'Index Name' in plan:
+        node += f' using {plan["Index Name"]}'
+    if 'Relation Name' in plan:
+        node += f' on {plan["Relation Name"]}'
+
+    yield node
+    for subplan in plan.get('Plans', []):
+        yield from _walk_postgresql_plan(subplan)
+
+
+def is_sequential_scan(node: str) -> bool:
+    """
+    Check whether the plan node reads a whole table
+    Args:
+        node: plan node from explain()
+    Returns:
+        True if it is a sequential scan
+    """
+    return node.startswith('Seq Scan') or (node.startswith('SCAN ') and ' USING ' not in node)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create commands
+class Command(BaseCommand):
+    """
+    Record query counts, normalized SQL and query plans of the users endpoints and compare them with snapshots
+    """
+    help = ('Check query counts and query plans of apps.api.v1.users and apps.frontend.users endpoints '
+            'against the checked-in snapshot of the database vendor (runs on a test database)')
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--users', type=int, default=20000, help='number of seeded users')
+        parser.add_argument('--update', action='store_true', help='write the snapshot instead of checking it')
+
+    def handle(self, *args, **options) -> None:
+        """
+        Run scenarios on the seeded database and check or update the snapshot
+        """
+        self._check_coverage()
+
+        # Scenarios run on a separate test database like the test runner does
+        database_name: str = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(SERVICE_TOKENS={'query-snapshots': SERVICE_TOKEN}):
+                self._seed(options['users'])
+                recorded: dict[str, dict] = {scenario.name: self._record(scenario) for scenario in SCENARIOS}
+        finally:
+            connection.creation.destroy_test_db(database_name, verbosity=0)
+
+        path: Path = SNAPSHOTS_DIR / f'{connection.vendor}.json'
+
+        if options['update']:
+            SNAPSHOTS_DIR.mkdir(exist_ok=True)
+            path.write_text(json.dumps(recorded, indent=2, ensure_ascii=False) + '\n')
+            self.stdout.write(f'Snapshot of {len(recorded)} scenarios written to {path}')
+            return
+
+        if not path.exists():
+            raise CommandError(f'No snapshot for {connection.vendor}, run with --update')
+
+        failures: list[str] = self._compare(json.loads(path.read_text()), recorded)
+        if failures:
+            raise CommandError('\n'.join(failures))
+
+        self.stdout.write(self.style.SUCCESS(f'{len(recorded)} scenarios match {path.name}'))
+
+    @staticmethod
+    def _check_coverage() -> None:
+        """
+        Check that every covered url has a scenario
+        """
+        covered: set[str] = {scenario.url for scenario in SCENARIOS}
+        missing: list[str] = [
+            f'{module}:{pattern.name}'
+            for module, (urls, _) in URL_MODULES.items()
+            for pattern in urls.urlpatterns
+            if f'{module}:{pattern.name}' not in covered
+        ]
+
+        if missing:
+            raise CommandError(f'No scenarios for urls: {", ".join(missing)}')
+
+    @staticmethod
+    def _seed(users: int) -> None:
+        """
+        Create the referrer, the invitee and a large number of other users and update planner statistics
+        Args:
+            users: number of other users
+        """
+        referrer: User = User.objects.create(phone_number=REFERRER_PHONE_NUMBER, invite_code=REFERRER_INVITE_CODE)
+        referrer.set_password(None)
+        referrer.save(update_fields=('password',))
+        User.objects.create(phone_number=INVITEE_PHONE_NUMBER, invite_code='INVITE')
+
+        User.objects.bulk_create(
+            (
+                User(
+                    phone_number=f'+7{index:010d}',
+                    invite_code=f'S{index:05d}',
+                    invited_by_code=REFERRER_INVITE_CODE if index <= REFERRER_INVITED_USERS else f'S{index // 2:05d}'
+                )
+                for index in range(1, users + 1)
+            ),
+            batch_size=1000
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    @staticmethod
+    def _record(scenario: Scenario) -> dict:
+        """
+        Run the scenario request and record its queries
+        Args:
+            scenario: scenario to run
+        Returns:
+            dict with query count, normalized SQL and plans
+        """
+        # The same cache state for every run (reused one time passwords skip queries)
+        cache.clear()
+
+        client = Client()
+        if scenario.user:
+            phone_number: str = REFERRER_PHONE_NUMBER if scenario.user == 'referrer' else INVITEE_PHONE_NUMBER
+            client.force_login(User.objects.get(phone_number=phone_number))
+
+        # API request bodies are sent as JSON, frontend ones as forms
+        extra: dict = {}
+        if scenario.url.startswith('api:') and scenario.method != 'get':
+            extra['content_type'] = 'application/json'
+
+        with override_settings(**scenario.settings):
+            data: dict = {**scenario.data, **(scenario.prepare(client) if scenario.prepare else {})}
+
+            with CaptureQueriesContext(connection) as queries:
+                response = getattr(client, scenario.method)(scenario.get_path(), data, **extra, **scenario.headers)
+
+        if response.status_code >= 400:
+            raise CommandError(f'{scenario.name}: unexpected status {response.status_code}')
+
+        return {
+            'count': len(queries.captured_queries),
+            'queries': [normalize_sql(query['sql']) for query in queries.captured_queries],
+            'plans': [explain(query['sql']) for query in queries.captured_queries],
+        }
+
+    def _compare(self, snapshot: dict[str, dict], recorded: dict[str, dict]) -> list[str]:
+        """
+        Compare recorded scenarios with the snapshot.
+        Grown query count or a new sequential scan fail the check, changed SQL is reported
+        Args:
+            snapshot: scenarios from the snapshot file
+            recorded: recorded scenarios
+        Returns:
+            list of failures
+        """
+        failures: list[str] = []
+
+        for name, current in recorded.items():
+            expected: dict | None = snapshot.get(name)
+            if expected is None:
+                failures.append(f'{name}: no snapshot, run with --update')
+                continue
+
+            if current['count'] > expected['count']:
+                failures.append(f'{name}: {current["count"]} queries, expected {expected["count"]}')
+            elif current['count'] < expected['count']:
+                self.stdout.write(f'{name}: {current["count"]} queries instead of {expected["count"]}, '
+                                  f'update the snapshot')
+
+            scans: set[str] = {node for plan in current['plans'] for node in plan if is_sequential_scan(node)}
+            expected_scans: set[str] = {node for plan in expected['plans'] for node in plan}
+            for node in sorted(scans - expected_scans):
+                failures.append(f'{name}: new sequential scan "{node}"')
+
+            if current['queries'] != expected['queries']:
+                self.stdout.write(self.style.WARNING(f'{name}: SQL changed'))
+                self.stdout.writelines(
+                    difflib.unified_diff(expected['queries'], current['queries'], 'snapshot', 'current', lineterm='')
+                )
+
+        return failures
@@ -0,0 +1,77 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Worker script: boot a fresh interpreter like a new worker and serve the first request
+WORKER_SCRIPT = '''
+import io, os, sys, time
+started = time.perf_counter()
+sys.path.append(os.path.join(os.getcwd(), 'apps'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+from wsgiref.util import setup_testing_defaults
+from config.wsgi import application
+booted = time.perf_counter()
+environ = {'PATH_INFO': sys.argv[1], 'wsgi.errors': io.StringIO()}
+setup_testing_defaults(environ)
+statuses = []
+b''.join(application(environ, lambda status, headers, exc_info=None: statuses.append(status)))
+done = time.perf_counter()
+print(statuses[0].split()[0], booted - started, done - booted)
+'''
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create commands
+class Command(BaseCommand):
+    """
+    Measure worker cold start: interpreter boot, Django setup and the first request
+    """
+    help = 'Measure worker cold start time (time to first request)'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--path', default='/api/v1/schema/', help='path of the first request')
+        parser.add_argument('--runs', type=int, default=5, help='number of fresh workers to start')
+        parser.add_argument('--json', action='store_true', help='print a single JSON line for metric tracking')
+
+    def handle(self, *args, **options) -> None:
+        """
+        Start fresh workers and print median timings in milliseconds
+        """
+        samples: dict[str, list[float]] = {'total': [], 'boot': [], 'first_request': []}
+
+        for _ in range(options['runs']):
+            started: float = time.perf_counter()
+            result = subprocess.run(
+                [sys.executable, '-c', WORKER_SCRIPT, options['path']],
+                cwd=settings.BASE_DIR, env=os.environ.copy(), capture_output=True, text=True,
+            )
+            total: float = time.perf_counter() - started
+
+            if result.returncode:
+                raise CommandError(result.stderr)
+
+            status, boot, first_request = result.stdout.split()[-3:]
+            if not status.startswith(('2', '3')):
+                raise CommandError(f'First request to {options["path"]} returned {status}')
+
+            samples['total'].append(total)
+            samples['boot'].append(float(boot))
+            samples['first_request'].append(float(first_request))
+
+        medians: dict[str, float] = {
+            name: round(statistics.median(values) * 1000, 1) for name, values in samples.items()
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps({'metric': 'cold_start_ms', 'path': options['path'], **medians}))
+            return
+
+        for name, value in medians.items():
+            self.stdout.write(f'{name:<15} {value:10.1f} ms')
@@ -0,0 +1,59 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+from django.test import Client
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Get user model
+User = get_user_model()
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create commands
+class Command(BaseCommand):
+    """
+    Measure bandwidth and latency of the profile endpoint for a user with many invited users
+    """
+    help = 'Measure profile response size and latency by encoding and with conditional GET (data is rolled back)'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--invited', type=int, default=5000, help='number of invited users')
+        parser.add_argument('--number', type=int, default=20, help='requests per measurement')
+
+    def handle(self, *args, **options) -> None:
+        """
+        Create a large-referrer profile in a rolled back transaction and print measurements
+        """
+        with transaction.atomic():
+            inviter: User = User.objects.create(phone_number='+70000000000', invite_code='BENCH0')
+            User.objects.bulk_create(
+                User(phone_number=f'+7{index:010d}', invite_code=f'B{index:05d}', invited_by_code='BENCH0')
+                for index in range(1, options['invited'] + 1)
+            )
+
+            client = Client()
+            client.force_login(inviter)
+            url: str = '/api/v1/users/profile'
+            etag: str = client.get(url, HTTP_ACCEPT='application/json')['ETag']
+
+            cases: dict[str, dict] = {
+                'identity': {'HTTP_ACCEPT_ENCODING': 'identity'},
+                'gzip': {'HTTP_ACCEPT_ENCODING': 'gzip'},
+                'br': {'HTTP_ACCEPT_ENCODING': 'gzip, br'},
+                'br + If-None-Match': {'HTTP_ACCEPT_ENCODING': 'gzip, br', 'HTTP_IF_NONE_MATCH': etag},
+            }
+
+            self.stdout.write(f'{options["invited"]} invited users')
+            for name, headers in cases.items():
+                started: float = time.perf_counter()
+                for _ in range(options['number']):
+                    response = client.get(url, HTTP_ACCEPT='application/json', **headers)
+                elapsed: float = (time.perf_counter() - started) / options['number']
+
+                self.stdout.write(
+                    f'{name:<20} {response.status_code} {len(response.content):>10} bytes {elapsed * 1000:8.2f} ms'
+                )
+
+            transaction.set_rollback(True)
@@ -0,0 +1,16 @@
+from rest_framework.permissions import BasePermission
+from rest_framework.request import Request
+from rest_framework.views import APIView
+
+from apps.api.authentication import ServiceTokenAuthentication
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create permissions
+class IsService(BasePermission):
+    """
+    Allow access to internal services authenticated by ServiceTokenAuthentication only
+    """
+
+    def has_permission(self, request: Request, view: APIView) -> bool:
+        return isinstance(request.successful_authenticator, ServiceTokenAuthentication)
@@ -0,0 +1,89 @@
+from typing import Iterable, Iterator
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create renderers
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer backed by orjson with the same output as the default renderer.
+    Falls back to the default renderer if orjson is not installed
+    or the output can not be produced by orjson (indent, ascii or non-compact output,
+    values orjson does not support, ex. integers out of 64-bit range)
+    """
+    encoder: JSONEncoder = JSONEncoder()
+    options: int = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def render(self, data, accepted_media_type: str = None, renderer_context: dict = None) -> bytes:
+        """
+        Render data into JSON bytes
+        Args:
+            data: serialized data
+            accepted_media_type: accepted media type from request
+            renderer_context: context from view
+        Returns:
+            JSON bytes
+        """
+        if (
+                orjson is None
+                or data is None
+                or self.ensure_ascii
+                or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Datetime objects are passed to the DRF encoder to keep the same format
+        try:
+            ret: bytes = orjson.dumps(data, default=self.encoder.default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escape line separators the same way as the default renderer
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+        return ret
+
+
+# ------------------------------------------------------------------------------
+class NDJSONRenderer(ORJSONRenderer):
+    """
+    Newline delimited JSON renderer: every item of a list is rendered as a separate line.
+    Views can stream lines with render_lines()
+    """
+    media_type: str = 'application/x-ndjson'
+    format: str = 'ndjson'
+
+    def render(self, data, accepted_media_type: str = None, renderer_context: dict = None) -> bytes:
+        """
+        Render list items (or a single object) as JSON lines
+        Args:
+            data: serialized data
+            accepted_media_type: accepted media type from request
+            renderer_context: context from view
+        Returns:
+            JSON lines bytes
+        """
+        if data is None:
+            return b''
+
+        return b''.join(self.render_lines(data if isinstance(data, list) else [data]))
+
+    def render_lines(self, items: Iterable) -> Iterator[bytes]:
+        """
+        Render items as JSON lines one by one
+        Args:
+            items: serialized items
+        Returns:
+            iterator over lines
+        """
+        for item in items:
+            yield super().render(item) + b'\n'
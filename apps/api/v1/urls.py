@@ -1,10 +1,17 @@
+from django.conf import settings
 from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView
+from apps.api.v1.views import RedocView, SchemaFileView
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Create urls
 urlpatterns = [
     path('users/', include('apps.api.v1.users.urls')),
-    path("schema/", SpectacularAPIView.as_view(), name="schema"),
-    path("schema/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"),
+    path("schema/redoc/", RedocView.as_view(), name="redoc"),
 ]
+
+if settings.SCHEMA_PREBUILT:
+    urlpatterns.append(path("schema/", SchemaFileView.as_view(), name="schema"))
+else:
+    from drf_spectacular.views import SpectacularAPIView
+
+    urlpatterns.append(path("schema/", SpectacularAPIView.as_view(), name="schema"))
@@ -1,5 +1,6 @@
 import re
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_field, extend_schema_serializer, OpenApiExample
@@ -57,18 +58,26 @@ class UserIdentificationSerializer(serializers.ModelSerializer):
             value={'password': '0000'},
             request_only=True,
         ),
+        OpenApiExample(
+            name='challenge example',
+            value={'password': '0000', 'challenge': '<challenge from /login>'},
+            request_only=True,
+        ),
     ]
 )
 class UserAuthenticationSerializer(serializers.ModelSerializer):
     """
     Serializer for the user authentication with one time password
+    and optional signed challenge (instead of the phone number in session)
     """
     password = serializers.CharField(max_length=4)
+    challenge = serializers.CharField(required=False)
 
     class Meta:
         model = User
         fields = [
             'password',
+            'challenge',
         ]
 
     def validate_password(self, password: str) -> str:
@@ -115,8 +124,7 @@ class UserSerializer(serializers.ModelSerializer):
         Returns:
             updated user instance
         """
-        user.invited_by_code = validated_data['invited_by_code']
-        user.save(update_fields=('invited_by_code',))
+        user.redeem_invite_code(validated_data['invited_by_code'])
 
         return user
 
@@ -153,3 +161,67 @@ class UserSerializer(serializers.ModelSerializer):
             empty list or list with phone numbers
         """
         return [user.phone_number for user in User.objects.filter(invited_by_code=user.invite_code)]
+
+
+# ------------------------------------------------------------------------------
+class UserProfileSerializer(serializers.BaseSerializer):
+    """
+    Read-only serializer for the user profile (fast path of the UserSerializer)
+    """
+
+    def to_representation(self, user: User) -> dict:
+        """
+        Build profile payload with the same schema as UserSerializer
+        Args:
+            user: user instance
+        Returns:
+            dict with profile data
+        """
+        return {
+            'id': user.id,
+            'phone_number': user.phone_number,
+            'invite_code': user.invite_code,
+            'invited_by_code': user.invited_by_code,
+            'invited_users': list(
+                User.objects.filter(invited_by_code=user.invite_code).values_list('phone_number', flat=True)
+            ),
+        }
+
+
+# ------------------------------------------------------------------------------
+@extend_schema_serializer(
+    examples=[
+        OpenApiExample(
+            name='lookup example',
+            value={'ids': [1, 2], 'phone_numbers': ['+79991234567'], 'invite_codes': ['a1B2c3']},
+            request_only=True,
+        ),
+    ]
+)
+class UserLookupSerializer(serializers.Serializer):
+    """
+    Serializer for the bulk user lookup by ids, phone numbers and invite codes
+    """
+    # Ids out of the BigAutoField range are rejected before they reach the query
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=2 ** 63 - 1), required=False, default=list
+    )
+    phone_numbers = serializers.ListField(child=serializers.CharField(max_length=12), required=False, default=list)
+    invite_codes = serializers.ListField(child=serializers.CharField(max_length=6), required=False, default=list)
+
+    def validate(self, attrs: dict) -> dict:
+        """
+        Check total number of keys
+        Args:
+            attrs: validated fields
+        Returns:
+            checked fields or raise exception
+        """
+        total: int = sum(len(values) for values in attrs.values())
+
+        if not total:
+            raise serializers.ValidationError('At least one id, phone number or invite code is required')
+        elif total > settings.USER_LOOKUP_MAX_ITEMS:
+            raise serializers.ValidationError(f'No more than {settings.USER_LOOKUP_MAX_ITEMS} keys are allowed')
+
+        return attrs
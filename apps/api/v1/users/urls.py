@@ -9,4 +9,5 @@ urlpatterns = [
     path('login', views.UserSignupLoginView.as_view(), name='user-login'),
     path('authenticate', views.UserAuthenticationView.as_view(), name='user-authenticate'),
     path('profile', views.UserRetrieveView.as_view(), name='user-profile'),
+    path('lookup', views.UserLookupView.as_view(), name='user-lookup'),
 ]
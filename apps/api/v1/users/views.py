@@ -1,14 +1,29 @@
+import hashlib
+import math
+import time
+
+from django.conf import settings
 from django.contrib.auth import get_user_model, authenticate, login, logout
+from django.core.cache import cache
+from django.http import HttpResponseNotModified, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
 from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiExample
 
 from rest_framework import status
-from rest_framework.generics import CreateAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework.generics import CreateAPIView, GenericAPIView, RetrieveUpdateDestroyAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 
-from apps.api.v1.users.serializers import UserIdentificationSerializer, UserAuthenticationSerializer, UserSerializer
-from apps.users.tasks import send_sms
+from apps.api.authentication import ServiceTokenAuthentication
+from apps.api.permissions import IsService
+from apps.api.renderers import ORJSONRenderer, NDJSONRenderer
+from apps.api.v1.users.serializers import UserIdentificationSerializer, UserAuthenticationSerializer, UserSerializer, \
+    UserProfileSerializer, UserLookupSerializer
+from apps.core.tracing import span
+from apps.users.lookup import LOOKUP_FIELDS, lookup_users
+from apps.users.otp import OneTimePassword, issue_one_time_password, sign_challenge, authenticate_challenge
+from apps.users.sms import SMSError
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Get user model
@@ -26,7 +41,11 @@ class UserSignupLoginView(CreateAPIView):
 
     @extend_schema(
         summary='Identification/registration',
-        description='Identify user by phone number or create a new user',
+        description='Identify user by phone number or create a new user. '
+                    'Password issued within the resend cooldown is reused, '
+                    'retries with the same Idempotency-Key header get the same response. '
+                    'The signed challenge can be sent to /authenticate instead of keeping the phone number '
+                    'in session (required if OTP_CHALLENGE_MODE is on)',
         # responses={status.HTTP_204_NO_CONTENT: None},
         responses={
             status.HTTP_201_CREATED: OpenApiResponse(
@@ -34,9 +53,11 @@ class UserSignupLoginView(CreateAPIView):
                 description='SMS send imitation',
                 examples=[OpenApiExample(
                     name='OTP example',
-                    value={'one_time_password': '0000'},
+                    value={'one_time_password': '0000', 'resend_cooldown': 60, 'challenge': '<signed challenge>'},
                     response_only=True,
-                )])},
+                )]),
+            status.HTTP_503_SERVICE_UNAVAILABLE: None,
+        },
     )
     def post(self, request: Request, *args, **kwargs) -> Response:
         """
@@ -44,39 +65,54 @@ class UserSignupLoginView(CreateAPIView):
         Args:
             request: HTTP request
         Returns:
-            HTTP response 201 with one time password (for debug only)
+            - HTTP response 201 with one time password (for debug only), remaining resend cooldown and challenge
+            - HTTP response 503 if SMS could not be sent
         """
         serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        with span('serializer.validate', serializer=type(serializer).__name__):
+            serializer.is_valid(raise_exception=True)
 
         phone_number: str = serializer.validated_data['phone_number']
-        request.session['phone_number'] = phone_number
-
-        user: User = User.objects.filter(phone_number=phone_number).first()
-        one_time_password: str = User.generate_one_time_password()
+        if not settings.OTP_CHALLENGE_MODE:
+            request.session['phone_number'] = phone_number
 
-        if user:
-            user.set_password(one_time_password)
-            user.save(update_fields=('password',))
-        else:
-            new_user: User = User.objects.create(
-                phone_number=phone_number,
-                password=one_time_password
+        # Replay the response for a retried request with the same Idempotency-Key
+        idempotency_key: str | None = request.headers.get('Idempotency-Key')
+        if idempotency_key:
+            # The header is client supplied, its hash keeps the cache key short and free of spaces
+            idempotency_cache_key: str = (
+                f'idempotency:login:{phone_number}:{hashlib.sha256(idempotency_key.encode()).hexdigest()}'
             )
-            new_user.set_password(one_time_password)
-            new_user.generate_invite_code()
-            new_user.save(
-                update_fields=(
-                    'password', 'invite_code'
+            replayed: dict | None = cache.get(idempotency_cache_key)
+            if replayed and 'resend_at' in replayed:
+                # Remaining cooldown is counted at the replay time
+                return Response(
+                    status=status.HTTP_201_CREATED,
+                    data={
+                        **replayed['data'],
+                        'resend_cooldown': max(math.ceil(replayed['resend_at'] - time.time()), 0),
+                    }
                 )
-            )
 
-        # SMS send imitation
-        send_sms(one_time_password)
+        try:
+            one_time_password: OneTimePassword = issue_one_time_password(phone_number)
+        except SMSError:
+            return Response(status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
         # response = Response(status=status.HTTP_204_NO_CONTENT)
-        response = Response(status=status.HTTP_201_CREATED,
-                            data={'one_time_password': one_time_password})
+        data: dict = {
+            'one_time_password': one_time_password.password,
+            'resend_cooldown': one_time_password.cooldown,
+            'challenge': sign_challenge(phone_number, one_time_password.nonce)
+        }
+        if idempotency_key:
+            cache.set(
+                idempotency_cache_key,
+                {'data': data, 'resend_at': time.time() + one_time_password.cooldown},
+                timeout=settings.IDEMPOTENCY_KEY_TIMEOUT
+            )
+
+        response = Response(status=status.HTTP_201_CREATED, data=data)
 
         return response
 
@@ -91,7 +127,8 @@ class UserAuthenticationView(CreateAPIView):
 
     @extend_schema(
         summary='Authentication',
-        description='Authenticate user using one time password',
+        description='Authenticate user using one time password and the challenge from /login '
+                    '(or the phone number saved in session by /login)',
         responses={
             status.HTTP_201_CREATED: None,
             status.HTTP_400_BAD_REQUEST: None
@@ -107,16 +144,21 @@ class UserAuthenticationView(CreateAPIView):
             - HTTP response 400
         """
         serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-
-        saved_phone_number: str = request.session.get('phone_number')
+        with span('serializer.validate', serializer=type(serializer).__name__):
+            serializer.is_valid(raise_exception=True)
 
         password: str = serializer.validated_data['password']
-        user: User = authenticate(
-            request,
-            phone_number=saved_phone_number,
-            password=password
-        )
+        challenge: str | None = serializer.validated_data.get('challenge')
+
+        with span('auth.authenticate'):
+            if challenge:
+                user: User | None = authenticate_challenge(request, challenge, password)
+            else:
+                user = authenticate(
+                    request,
+                    phone_number=request.session.get('phone_number'),
+                    password=password
+                )
 
         if user:
             login(request, user)
@@ -143,6 +185,17 @@ class UserRetrieveView(RetrieveUpdateDestroyAPIView):
         """
         return self.request.user
 
+    def get_serializer_class(self) -> type[UserSerializer | UserProfileSerializer]:
+        """
+        Get the read-only serializer for the profile retrieve
+        Returns:
+            serializer class for the request method
+        """
+        if self.request.method == 'GET':
+            return UserProfileSerializer
+
+        return UserSerializer
+
     @extend_schema(
         summary='Profile',
         description='Get user profile',
@@ -151,8 +204,32 @@ class UserRetrieveView(RetrieveUpdateDestroyAPIView):
             status.HTTP_403_FORBIDDEN: None,
         }
     )
-    def get(self, request: Request, *args, **kwargs) -> Response:
-        return self.retrieve(request, *args, **kwargs)
+    def get(self, request: Request, *args, **kwargs) -> Response | HttpResponseNotModified:
+        """
+        Get user profile or 304 if it is not modified.
+        ETag is built from the profile version stamp without serializing the profile. There is no Last-Modified:
+        its whole-second precision would answer 304 after a change within the same second
+        Args:
+            request: HTTP request
+        Returns:
+            - HTTP response 200 with profile
+            - HTTP response 304 if profile is not modified
+        """
+        user: User = self.get_object()
+        etag: str = f'"{user.pk}-{user.profile_updated_at.timestamp():.6f}-{request.accepted_renderer.format}"'
+
+        not_modified: HttpResponseNotModified | None = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        with span('serializer.serialize', serializer='UserProfileSerializer'):
+            response: Response = self.retrieve(request, *args, **kwargs)
+
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        patch_vary_headers(response, ('Accept', 'Cookie'))
+
+        return response
 
     @extend_schema(
         summary='Invite code confirmation',
@@ -188,3 +265,57 @@ class UserRetrieveView(RetrieveUpdateDestroyAPIView):
         logout(request)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+# ------------------------------------------------------------------------------
+@extend_schema(tags=['Internal'])
+class UserLookupView(GenericAPIView):
+    """
+    GenericAPIView for the bulk user lookup by internal services
+    """
+    serializer_class = UserLookupSerializer
+    authentication_classes: list = [ServiceTokenAuthentication]
+    permission_classes: list = [IsService]
+    renderer_classes: list = [ORJSONRenderer, NDJSONRenderer]
+
+    @extend_schema(
+        summary='Bulk lookup',
+        description='Find users by ids, phone numbers and invite codes in one request. '
+                    'Rows contain values of "fields" in the same order, each user is returned once. '
+                    'With "Accept: application/x-ndjson" rows are streamed as JSON lines. '
+                    'Requires "Authorization: Bearer <service token>"',
+        responses={
+            status.HTTP_200_OK: OpenApiResponse(
+                description='Found users',
+                examples=[OpenApiExample(
+                    name='lookup example',
+                    value={'fields': list(LOOKUP_FIELDS), 'rows': [[1, '+79991234567', 'a1B2c3', None]]},
+                    response_only=True,
+                )]),
+            status.HTTP_400_BAD_REQUEST: None,
+            status.HTTP_401_UNAUTHORIZED: None,
+        },
+    )
+    def post(self, request: Request, *args, **kwargs) -> Response | StreamingHttpResponse:
+        """
+        Look up users with chunked IN queries
+        Args:
+            request: HTTP request
+        Returns:
+            - HTTP response 200 with field names and rows or streamed JSON lines with rows
+            - HTTP response 400 if data is not valid
+        """
+        serializer = self.get_serializer(data=request.data)
+        with span('serializer.validate', serializer=type(serializer).__name__):
+            serializer.is_valid(raise_exception=True)
+
+        rows = lookup_users(**serializer.validated_data)
+
+        if isinstance(request.accepted_renderer, NDJSONRenderer):
+            # Rows are queried and sent chunk by chunk
+            return StreamingHttpResponse(
+                request.accepted_renderer.render_lines(rows),
+                content_type=NDJSONRenderer.media_type
+            )
+
+        return Response(data={'fields': LOOKUP_FIELDS, 'rows': list(rows)})
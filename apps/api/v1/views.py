@@ -0,0 +1,86 @@
+import hashlib
+import json
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, Http404
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.utils.http import urlencode
+from django.views import View
+from django.views.decorators.http import etag
+from django.views.generic import TemplateView
+from drf_spectacular.settings import spectacular_settings
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Load prebuilt schema
+@lru_cache(maxsize=1)
+def load_schema() -> tuple[bytes, str]:
+    """
+    Read the prebuilt OpenAPI schema once per process
+    Returns:
+        schema file content and its ETag
+    """
+    try:
+        content: bytes = settings.SCHEMA_FILE.read_bytes()
+    except FileNotFoundError:
+        raise Http404('Schema file is not built')
+
+    return content, f'"{hashlib.sha256(content).hexdigest()}"'
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create views
+@method_decorator(etag(lambda request, *args, **kwargs: load_schema()[1]), name='get')
+class SchemaFileView(View):
+    """
+    View for the prebuilt OpenAPI schema (python manage.py spectacular --file schema.yml)
+    """
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        """
+        Get the prebuilt schema
+        Args:
+            request: HttpRequest from user
+        Returns:
+            - HttpResponse 200 with schema
+            - HttpResponse 304 if schema is not modified
+        """
+        content, _ = load_schema()
+        response = HttpResponse(content, content_type='application/vnd.oai.openapi; charset=utf-8')
+        response['Cache-Control'] = 'no-cache'
+
+        return response
+
+
+# ------------------------------------------------------------------------------
+class RedocView(TemplateView):
+    """
+    Redoc page for the schema. Renders the drf-spectacular template with the context of SpectacularRedocView
+    (REDOC_DIST including SIDECAR, REDOC_UI_SETTINGS, lang and version parameters) without importing
+    drf_spectacular.views, which pulls in the schema generator
+    """
+    template_name = 'drf_spectacular/redoc.html'
+
+    def get_context_data(self, **kwargs) -> dict:
+        if spectacular_settings.REDOC_DIST == 'SIDECAR':
+            redoc_standalone: str = static('drf_spectacular_sidecar/redoc/bundles/redoc.standalone.js')
+        else:
+            redoc_standalone = f'{spectacular_settings.REDOC_DIST}/bundles/redoc.standalone.js'
+
+        redoc_settings: dict | str | None = spectacular_settings.REDOC_UI_SETTINGS
+        if redoc_settings and not isinstance(redoc_settings, str):
+            redoc_settings = json.dumps(redoc_settings, indent=2)
+
+        query: dict = {key: self.request.GET[key] for key in ('lang', 'version') if self.request.GET.get(key)}
+        schema_url: str = reverse('schema') + (f'?{urlencode(query)}' if query else '')
+
+        return {
+            **super().get_context_data(**kwargs),
+            'title': spectacular_settings.TITLE,
+            'redoc_standalone': redoc_standalone,
+            'schema_url': schema_url,
+            'settings': redoc_settings or None,
+        }
@@ -0,0 +1,44 @@
+import io
+import pstats
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create commands
+class Command(BaseCommand):
+    """
+    Aggregate profiling dumps into a top-N hot function report
+    """
+    help = 'Aggregate profiling dumps from PROFILING_DIR into a top-N hot function report'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--dir', default=settings.PROFILING_DIR, help='directory with .prof files')
+        parser.add_argument('--match', default='', help='only dumps with the substring in the name (ex. users-profile)')
+        parser.add_argument('--sort', default='tottime', choices=['tottime', 'cumulative', 'ncalls'])
+        parser.add_argument('--limit', type=int, default=20, help='number of functions in the report')
+        parser.add_argument('--output', help='write aggregated pstats file (for flame graph tools)')
+
+    def handle(self, *args, **options) -> None:
+        """
+        Print aggregated report
+        """
+        dumps: list[Path] = sorted(
+            path for path in Path(options['dir']).glob('*.prof') if options['match'] in path.name
+        )
+        if not dumps:
+            raise CommandError(f'No profiling dumps in {options["dir"]}')
+
+        stream = io.StringIO()
+        stats = pstats.Stats(str(dumps[0]), stream=stream)
+        for path in dumps[1:]:
+            stats.add(str(path))
+
+        if options['output']:
+            stats.dump_stats(options['output'])
+
+        self.stdout.write(f'{len(dumps)} dumps')
+        stats.strip_dirs().sort_stats(options['sort']).print_stats(options['limit'])
+        self.stdout.write(stream.getvalue())
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.middleware import make_profiling_token
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create commands
+class Command(BaseCommand):
+    """
+    Print signed token for the X-Profile-Token header
+    """
+    help = 'Print signed token for the X-Profile-Token header (valid for PROFILING_TOKEN_MAX_AGE seconds)'
+
+    def handle(self, *args, **options) -> None:
+        self.stdout.write(make_profiling_token())
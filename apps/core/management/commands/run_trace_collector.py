@@ -0,0 +1,64 @@
+import json
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand, CommandParser
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create commands
+class Command(BaseCommand):
+    """
+    Run local OTLP/HTTP JSON collector stand-in
+    """
+    help = 'Run local OTLP/HTTP JSON collector stand-in (POST /v1/traces)'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=4318)
+        parser.add_argument('--output', help='append received traces as JSON lines to the file')
+
+    def handle(self, *args, **options) -> None:
+        """
+        Serve collector API until interrupted and print a summary of each trace
+        """
+        stdout = self.stdout
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self) -> None:
+                body: bytes = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                payload: dict = json.loads(body or b'{}')
+
+                if options['output']:
+                    with open(options['output'], 'a') as file:
+                        file.write(json.dumps(payload) + '\n')
+
+                for resource_spans in payload.get('resourceSpans', []):
+                    for scope_spans in resource_spans.get('scopeSpans', []):
+                        spans: list[dict] = scope_spans.get('spans', [])
+                        durations: Counter = Counter()
+                        for span in spans:
+                            durations[span['name']] += int(span['endTimeUnixNano']) - int(span['startTimeUnixNano'])
+                        summary: str = ', '.join(
+                            f'{name} {nanoseconds / 1_000_000:.1f} ms' for name, nanoseconds in durations.most_common()
+                        )
+                        stdout.write(f'{len(spans)} spans: {summary}')
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'{}')
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        server = ThreadingHTTPServer((options['host'], options['port']), Handler)
+        self.stdout.write(f'Trace collector on http://{options["host"]}:{options["port"]}/v1/traces')
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
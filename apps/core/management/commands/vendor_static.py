@@ -0,0 +1,74 @@
+import hashlib
+import urllib.request
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create commands
+class Command(BaseCommand):
+    """
+    Download pinned third-party assets into the project static directory and check them against
+    the SHA-256 sums of VENDOR_STATIC_CHECKSUMS (sha256sum format). The files and the sums are committed,
+    templates use the CDN URLs until then (see core.templatetags.vendor)
+    """
+    help = 'Download VENDOR_STATIC_ASSETS into VENDOR_STATIC_DIR and verify checksums (commit the files and the sums)'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--force', action='store_true', help='download files which already exist')
+        parser.add_argument('--pin', action='store_true',
+                            help='write checksums of the downloaded files instead of verifying them')
+
+    def handle(self, *args, **options) -> None:
+        """
+        Download missing assets, then verify (or pin) checksums of all assets
+        """
+        checksums: dict[str, str] = {} if options['pin'] else self._read_checksums()
+
+        for name, url in settings.VENDOR_STATIC_ASSETS.items():
+            if not options['pin'] and name not in checksums:
+                raise CommandError(f'{name} has no pinned checksum, run "manage.py vendor_static --pin"')
+
+            path: Path = Path(settings.VENDOR_STATIC_DIR, name)
+
+            if not path.exists() or options['force']:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    content: bytes = response.read()
+
+                digest: str = hashlib.sha256(content).hexdigest()
+                if not options['pin'] and digest != checksums[name]:
+                    raise CommandError(f'{name} from {url} has SHA-256 {digest}, expected {checksums[name]}')
+
+                path.write_bytes(content)
+                self.stdout.write(f'{name} <- {url}')
+            else:
+                digest = hashlib.sha256(path.read_bytes()).hexdigest()
+                if not options['pin'] and digest != checksums[name]:
+                    raise CommandError(f'{path} has SHA-256 {digest}, expected {checksums[name]}')
+
+            checksums[name] = digest
+
+        if options['pin']:
+            Path(settings.VENDOR_STATIC_CHECKSUMS).write_text(
+                ''.join(f'{digest}  {name}\n' for name, digest in sorted(checksums.items()))
+            )
+            self.stdout.write(f'Checksums written to {settings.VENDOR_STATIC_CHECKSUMS}')
+
+    @staticmethod
+    def _read_checksums() -> dict[str, str]:
+        """
+        Read pinned checksums
+        Returns:
+            SHA-256 hex digests by asset name
+        """
+        try:
+            lines: list[str] = Path(settings.VENDOR_STATIC_CHECKSUMS).read_text().splitlines()
+        except FileNotFoundError:
+            raise CommandError(
+                f'{settings.VENDOR_STATIC_CHECKSUMS} is missing, run "manage.py vendor_static --pin" and commit it'
+            )
+
+        return {name: digest for digest, name in (line.split(maxsplit=1) for line in lines if line.strip())}
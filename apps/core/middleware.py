@@ -0,0 +1,243 @@
+import cProfile
+import mimetypes
+import os
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Callable, Iterator
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpRequest, HttpResponse
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Signer for profiling tokens
+PROFILING_SALT = 'core.profiling'
+
+
+def make_profiling_token() -> str:
+    """
+    Make signed token for the X-Profile-Token header
+    Returns:
+        string with token
+    """
+    return signing.TimestampSigner(salt=PROFILING_SALT).sign('profile')
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create middleware
+class ProfilingMiddleware:
+    """
+    Profile selected requests with cProfile and dump pstats files into PROFILING_DIR.
+    Request is selected with a signed X-Profile-Token header or X-Profile header of a staff user.
+    Number of profiled requests per minute is capped by PROFILING_MAX_PER_MINUTE
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        self._signer: signing.TimestampSigner = signing.TimestampSigner(salt=PROFILING_SALT)
+        self._started: deque = deque()
+        self._rate_lock: threading.Lock = threading.Lock()
+        # Only one profiler can be active in the process
+        self._profiler_lock: threading.Lock = threading.Lock()
+        os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not self._is_selected(request) or not self._acquire():
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        try:
+            response: HttpResponse = profiler.runcall(self.get_response, request)
+        finally:
+            self._profiler_lock.release()
+
+        slug: str = re.sub(r'[^a-zA-Z0-9]+', '-', request.path).strip('-') or 'root'
+        file_name: str = f'{time.strftime("%Y%m%d-%H%M%S")}-{request.method}-{slug}-{uuid.uuid4().hex[:8]}.prof'
+        profiler.dump_stats(os.path.join(settings.PROFILING_DIR, file_name))
+        response['X-Profile-File'] = file_name
+
+        return response
+
+    def _is_selected(self, request: HttpRequest) -> bool:
+        """
+        Check that request asks for profiling
+        Args:
+            request: HttpRequest from user
+        Returns:
+            True if request has valid token or comes from a staff user
+        """
+        token: str | None = request.headers.get('X-Profile-Token')
+        if token:
+            try:
+                self._signer.unsign(token, max_age=settings.PROFILING_TOKEN_MAX_AGE)
+                return True
+            except signing.BadSignature:
+                return False
+
+        return 'X-Profile' in request.headers and getattr(request, 'user', None) is not None and request.user.is_staff
+
+    def _acquire(self) -> bool:
+        """
+        Check the rate cap and take the profiler
+        Returns:
+            True if request can be profiled
+        """
+        now: float = time.monotonic()
+        with self._rate_lock:
+            while self._started and now - self._started[0] > 60:
+                self._started.popleft()
+            if len(self._started) >= settings.PROFILING_MAX_PER_MINUTE:
+                return False
+            if not self._profiler_lock.acquire(blocking=False):
+                return False
+
+            self._started.append(now)
+            return True
+
+
+# ------------------------------------------------------------------------------
+class StaticFilesMiddleware:
+    """
+    Serve files from STATIC_ROOT before the rest of the middleware chain.
+    Precompressed .br/.gz copies are chosen by Accept-Encoding,
+    content-hashed files are cached by clients forever
+    """
+    encodings: tuple[tuple[str, str], ...] = (('br', '.br'), ('gzip', '.gz'))
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+        self.prefix: str = settings.STATIC_URL
+        self.root: str = os.path.realpath(settings.STATIC_ROOT)
+        self._hashed_files: set[str] | None = None
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if request.method in ('GET', 'HEAD') and request.path.startswith(self.prefix):
+            response: HttpResponse | None = self._serve(request, request.path[len(self.prefix):])
+            if response is not None:
+                return response
+
+        return self.get_response(request)
+
+    @property
+    def hashed_files(self) -> set[str]:
+        """
+        Get content-hashed file names from the staticfiles manifest
+        Returns:
+            set of file names
+        """
+        if self._hashed_files is None:
+            self._hashed_files = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+        return self._hashed_files
+
+    def _serve(self, request: HttpRequest, name: str) -> FileResponse | None:
+        """
+        Get response with the static file
+        Args:
+            request: HttpRequest from user
+            name: file name relative to STATIC_ROOT
+        Returns:
+            FileResponse or None if the file does not exist
+        """
+        path: str = os.path.realpath(os.path.join(self.root, name))
+        if not path.startswith(self.root + os.sep) or not os.path.isfile(path):
+            return None
+
+        content_type: str = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        accept_encoding: str = request.headers.get('Accept-Encoding', '')
+        encoding: str | None = None
+
+        for candidate, extension in self.encodings:
+            if candidate in accept_encoding and os.path.isfile(path + extension):
+                path, encoding = path + extension, candidate
+                break
+
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Vary'] = 'Accept-Encoding'
+
+        if name in self.hashed_files:
+            response['Cache-Control'] = f'public, max-age={settings.STATIC_IMMUTABLE_MAX_AGE}, immutable'
+        else:
+            response['Cache-Control'] = f'public, max-age={settings.STATIC_MAX_AGE}'
+
+        return response
+
+
+# ------------------------------------------------------------------------------
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compress responses larger than COMPRESSION_MIN_SIZE with brotli (if installed and accepted) or gzip.
+    Streaming responses are compressed chunk by chunk.
+    HTML is compressed with gzip only (gzip adds random bytes against BREACH)
+    """
+    compressible_types: tuple[str, ...] = (
+        'text/', 'application/json', 'application/javascript', 'application/vnd.oai.openapi', 'image/svg+xml',
+    )
+
+    def process_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        if not response.get('Content-Type', '').startswith(self.compressible_types):
+            return response
+        size: int = int(response.get('Content-Length', settings.COMPRESSION_MIN_SIZE)) if response.streaming \
+            else len(response.content)
+        if size < settings.COMPRESSION_MIN_SIZE:
+            return response
+        if (
+                brotli is None
+                or response.has_header('Content-Encoding')
+                or (response.streaming and response.is_async)
+                or response['Content-Type'].startswith('text/html')
+                or 'br' not in request.headers.get('Accept-Encoding', '')
+        ):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        if response.streaming:
+            response.streaming_content = self._compress_sequence(response.streaming_content)
+            del response.headers['Content-Length']
+        else:
+            compressed_content: bytes = brotli.compress(response.content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response.headers['Content-Length'] = str(len(response.content))
+
+        etag: str | None = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+
+        return response
+
+    @staticmethod
+    def _compress_sequence(sequence) -> Iterator[bytes]:
+        """
+        Compress streaming content, flushing after each chunk
+        Args:
+            sequence: iterator of bytes
+        Returns:
+            iterator of compressed bytes
+        """
+        compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        for chunk in sequence:
+            data: bytes = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
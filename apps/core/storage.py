@@ -0,0 +1,63 @@
+import gzip
+from typing import Iterator
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Compressed file extensions
+COMPRESSIBLE_EXTENSIONS: tuple[str, ...] = ('.css', '.js', '.svg', '.json', '.map', '.txt', '.html', '.xml')
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create storages
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest storage (content-hashed file names) which also writes .gz and .br (if brotli is installed)
+    copies of the hashed files on collectstatic.
+    Files missing from the manifest (collectstatic has not been run) get their unhashed URL instead of an error
+    """
+    manifest_strict = False
+
+    def stored_name(self, name: str) -> str:
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Not collected: the page renders and the file is served by the finders or answers 404
+            return name
+
+    def post_process(self, paths: dict, dry_run: bool = False, **options) -> Iterator[tuple]:
+        yield from super().post_process(paths, dry_run, **options)
+
+        if dry_run:
+            return
+
+        for hashed_name in set(self.hashed_files.values()):
+            if hashed_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self._compress(hashed_name)
+
+    def _compress(self, name: str) -> None:
+        """
+        Write compressed copies of the file if they are smaller than the original
+        Args:
+            name: hashed file name
+        """
+        with self.open(name) as file:
+            content: bytes = file.read()
+
+        if len(content) < settings.STATIC_COMPRESS_MIN_SIZE:
+            return
+
+        compressed: dict[str, bytes] = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            compressed['.br'] = brotli.compress(content, quality=11)
+
+        for extension, data in compressed.items():
+            if len(data) < len(content):
+                with open(self.path(name + extension), 'wb') as file:
+                    file.write(data)
@@ -0,0 +1,29 @@
+from functools import lru_cache
+from pathlib import Path
+
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create template library
+register: template.Library = template.Library()
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create tags
+@register.simple_tag
+@lru_cache(maxsize=None)
+def vendor_static(name: str) -> str:
+    """
+    Get URL of the third-party asset: the self-hosted file if it is committed into VENDOR_STATIC_DIR
+    (python manage.py vendor_static --pin), the pinned CDN URL of VENDOR_STATIC_ASSETS otherwise
+    Args:
+        name: asset name, ex. vendor/uikit/uikit.min.css
+    Returns:
+        asset URL
+    """
+    if Path(settings.VENDOR_STATIC_DIR, name).is_file():
+        return static(name)
+
+    return settings.VENDOR_STATIC_ASSETS[name]
@@ -0,0 +1,263 @@
+import json
+import logging
+import queue
+import secrets
+import threading
+import time
+import urllib.request
+from contextlib import ExitStack, contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Callable, ContextManager, Iterator
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+from django.template.backends.django import DjangoTemplates, Template
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Get logger
+logger = logging.getLogger(__name__)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create spans
+class Span:
+    """
+    Timed operation of the trace
+    """
+    __slots__ = ('trace', 'span_id', 'parent_id', 'name', 'attributes', 'start_ns', 'end_ns')
+
+    def __init__(self, trace: list['Span'], name: str, parent_id: str | None, attributes: dict) -> None:
+        self.trace: list[Span] = trace
+        self.span_id: str = secrets.token_hex(8)
+        self.parent_id: str | None = parent_id
+        self.name: str = name
+        self.attributes: dict = attributes
+        self.start_ns: int = time.time_ns()
+        self.end_ns: int = 0
+        trace.append(self)
+
+    def as_dict(self, trace_id: str) -> dict:
+        """
+        Get span in OTLP JSON format
+        Args:
+            trace_id: id of the trace
+        Returns:
+            dict with span data
+        """
+        return {
+            'traceId': trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_id or '',
+            'name': self.name,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': [
+                {'key': key, 'value': {'stringValue': str(value)}} for key, value in self.attributes.items()
+            ],
+        }
+
+
+_current_span: ContextVar[Span | None] = ContextVar('current_span', default=None)
+_noop: ContextManager = nullcontext()
+
+
+@contextmanager
+def _child_span(parent: Span, name: str, attributes: dict) -> Iterator[Span]:
+    child = Span(parent.trace, name, parent.span_id, attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    finally:
+        child.end_ns = time.time_ns()
+        _current_span.reset(token)
+
+
+def span(name: str, **attributes) -> ContextManager:
+    """
+    Start child span of the current request trace (no-op outside a trace or with tracing disabled)
+    Args:
+        name: span name (ex. 'db.query', 'sms.send')
+        **attributes: span attributes
+    Returns:
+        context manager
+    """
+    parent: Span | None = _current_span.get()
+    if parent is None:
+        return _noop
+
+    return _child_span(parent, name, attributes)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create exporters
+class FileExporter:
+    """
+    Append traces as JSON lines to the file
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+
+    def export(self, payload: dict) -> None:
+        with open(self.path, 'a') as file:
+            file.write(json.dumps(payload) + '\n')
+
+
+class OTLPExporter:
+    """
+    Send traces to OTLP/HTTP JSON collector
+    """
+
+    def __init__(self, endpoint: str) -> None:
+        self.endpoint: str = endpoint
+
+    def export(self, payload: dict) -> None:
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(payload).encode(),
+            headers={'Content-Type': 'application/json'},
+            method='POST',
+        )
+        urllib.request.urlopen(request, timeout=5).read()
+
+
+class BackgroundExporter:
+    """
+    Export traces from a background thread to keep the request path fast.
+    Traces are sent in batches, the queue is bounded: when the collector is slow or down new traces are dropped
+    and counted instead of piling up in memory
+    """
+
+    def __init__(self, exporter: FileExporter | OTLPExporter, queue_size: int, batch_size: int) -> None:
+        self.exporter: FileExporter | OTLPExporter = exporter
+        self.batch_size: int = batch_size
+        self.dropped: int = 0
+        self._reported_dropped: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        threading.Thread(target=self._run, name='trace-exporter', daemon=True).start()
+
+    def export(self, trace_id: str, spans: list[Span]) -> None:
+        try:
+            self._queue.put_nowait((trace_id, spans))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def _get_batch(self) -> list[tuple[str, list[Span]]]:
+        """
+        Wait for a trace and take the queued ones up to the batch size
+        Returns:
+            list of (trace id, spans) pairs
+        """
+        batch: list[tuple[str, list[Span]]] = [self._queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch: list[tuple[str, list[Span]]] = self._get_batch()
+            payload: dict = {
+                'resourceSpans': [{
+                    'resource': {
+                        'attributes': [{'key': 'service.name', 'value': {'stringValue': settings.TRACING_SERVICE_NAME}}]
+                    },
+                    'scopeSpans': [{
+                        'scope': {'name': __name__},
+                        'spans': [child.as_dict(trace_id) for trace_id, spans in batch for child in spans],
+                    }],
+                }]
+            }
+            try:
+                self.exporter.export(payload)
+            except Exception:
+                logger.exception('Trace export failed')
+
+            if self.dropped > self._reported_dropped:
+                logger.warning('%d traces dropped, the export queue is full', self.dropped - self._reported_dropped)
+                self._reported_dropped = self.dropped
+
+
+@lru_cache(maxsize=1)
+def get_exporter() -> BackgroundExporter:
+    """
+    Build exporter from TRACING_* settings once per process
+    Returns:
+        background exporter
+    """
+    exporter: FileExporter | OTLPExporter = (
+        OTLPExporter(settings.TRACING_OTLP_ENDPOINT) if settings.TRACING_OTLP_ENDPOINT
+        else FileExporter(settings.TRACING_FILE)
+    )
+
+    return BackgroundExporter(exporter, settings.TRACING_QUEUE_SIZE, settings.TRACING_BATCH_SIZE)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create middleware
+class TracingMiddleware:
+    """
+    Start a trace for each request and record every ORM query as a child span
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        if not settings.TRACING_ENABLED:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        trace: list[Span] = []
+        root = Span(trace, f'{request.method} {request.path}', None, {'http.method': request.method})
+        token = _current_span.set(root)
+
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(self._trace_query))
+                response: HttpResponse = self.get_response(request)
+        finally:
+            root.end_ns = time.time_ns()
+            _current_span.reset(token)
+
+        root.attributes['http.status_code'] = response.status_code
+        if request.resolver_match:
+            root.attributes['view'] = request.resolver_match._func_path
+
+        get_exporter().export(secrets.token_hex(16), trace)
+
+        return response
+
+    @staticmethod
+    def _trace_query(execute: Callable, sql: str, params, many: bool, context: dict):
+        with span('db.query', sql=sql, alias=context['connection'].alias):
+            return execute(sql, params, many, context)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create template backends
+class TracedTemplate(Template):
+    """
+    Django template with render span
+    """
+
+    def render(self, context: dict = None, request: HttpRequest = None) -> str:
+        with span('template.render', template=self.template.origin.template_name):
+            return super().render(context, request)
+
+
+class TracingDjangoTemplates(DjangoTemplates):
+    """
+    Django templates backend with render spans
+    """
+
+    def get_template(self, template_name: str) -> TracedTemplate:
+        return TracedTemplate(super().get_template(template_name).template, self)
@@ -0,0 +1,10 @@
+from django.urls import path
+
+from apps.core import views
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create urls
+urlpatterns = [
+    path('healthz', views.LivenessView.as_view(), name='healthz'),
+    path('readyz', views.ReadinessView.as_view(), name='readyz'),
+]
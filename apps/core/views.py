@@ -0,0 +1,45 @@
+from django.http import HttpRequest, JsonResponse
+from django.views import View
+
+from apps.core.warmup import is_ready, warm_up
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create views
+class LivenessView(View):
+    """
+    View for the liveness probe
+    """
+
+    @staticmethod
+    def get(request: HttpRequest) -> JsonResponse:
+        """
+        Check that the worker process serves requests
+        Args:
+            request: HttpRequest from load balancer
+        Returns:
+            JsonResponse 200
+        """
+        return JsonResponse({'status': 'alive'})
+
+
+# ------------------------------------------------------------------------------
+class ReadinessView(View):
+    """
+    View for the readiness probe
+    """
+
+    @staticmethod
+    def get(request: HttpRequest) -> JsonResponse:
+        """
+        Check that the worker is warmed up (retry warm-up if it has failed)
+        Args:
+            request: HttpRequest from load balancer
+        Returns:
+            - JsonResponse 200 if worker is ready
+            - JsonResponse 503 if worker is not ready
+        """
+        if is_ready() or warm_up():
+            return JsonResponse({'status': 'ready'})
+
+        return JsonResponse({'status': 'warming up'}, status=503)
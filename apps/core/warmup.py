@@ -0,0 +1,121 @@
+import logging
+import threading
+import time
+from typing import Callable
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.http import Http404, HttpRequest
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Get logger
+logger = logging.getLogger(__name__)
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Worker state
+_ready: bool = False
+_lock: threading.Lock = threading.Lock()
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create warm-up steps
+def resolve_urls() -> None:
+    """
+    Populate URL resolver of config.urls (imports all views)
+    """
+    get_resolver().reverse_dict
+
+
+def render_templates() -> None:
+    """
+    Compile templates into the cached template loader and render them once,
+    so render errors fail the warm-up (and /readyz) instead of the first page
+    """
+    request: HttpRequest = HttpRequest()
+    # Unsaved user, the templates do not query the database
+    context: dict = {'user': get_user_model()()}
+    for template_name in settings.WARM_UP_TEMPLATES:
+        get_template(template_name).render(context, request)
+
+
+def build_serializers() -> None:
+    """
+    Build serializer fields (imports serializers and fills model meta caches)
+    """
+    from apps.api.v1.users.serializers import UserIdentificationSerializer, UserAuthenticationSerializer, \
+        UserSerializer
+
+    for serializer_class in (UserIdentificationSerializer, UserAuthenticationSerializer, UserSerializer):
+        serializer_class().fields
+
+
+def check_connections() -> None:
+    """
+    Check that the databases are reachable. Connections are closed right away: warm-up runs in the import thread
+    (before fork with preloading servers), so each request thread opens its own one
+    """
+    for connection in connections.all():
+        connection.ensure_connection()
+        connection.close()
+
+
+def prefill_caches() -> None:
+    """
+    Prefill in-process caches
+    """
+    from apps.api.v1.views import load_schema
+
+    if settings.SCHEMA_PREBUILT:
+        try:
+            load_schema()
+        except Http404:
+            logger.warning('Schema file is not built')
+
+
+WARM_UP_STEPS: tuple[Callable[[], None], ...] = (
+    resolve_urls,
+    render_templates,
+    build_serializers,
+    check_connections,
+    prefill_caches,
+)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create warm-up
+def warm_up() -> bool:
+    """
+    Exercise first-request paths of the worker and mark it as ready
+    Returns:
+        True if the worker is ready
+    """
+    global _ready
+
+    with _lock:
+        if _ready:
+            return True
+
+        started: float = time.perf_counter()
+        try:
+            for step in WARM_UP_STEPS:
+                step()
+        except Exception:
+            logger.exception('Worker warm-up failed')
+            return False
+
+        _ready = True
+        logger.info('Worker warmed up in %.1f ms', (time.perf_counter() - started) * 1000)
+
+        return True
+
+
+def is_ready() -> bool:
+    """
+    Check the worker state
+    Returns:
+        True if the worker is warmed up
+    """
+    return _ready
@@ -36,6 +36,10 @@ class UserAuthenticationForm(forms.Form):
     password = forms.CharField(
         widget=forms.PasswordInput
     )
+    challenge = forms.CharField(
+        required=False,
+        widget=forms.HiddenInput
+    )
 
     def clean_password(self) -> str:
         """
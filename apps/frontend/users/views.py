@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model, authenticate, login, logout
 from django.forms import Form
 from django.http import HttpResponseRedirect, HttpResponse, HttpRequest
@@ -5,8 +6,10 @@ from django.shortcuts import render, redirect
 from django.urls import reverse
 from django.views import View
 
+from apps.core.tracing import span
 from apps.frontend.users.forms import UserSignupLoginForm, UserAuthenticationForm, InviteCodeForm, UserProfileForm
-from apps.users.tasks import send_sms
+from apps.users.otp import OneTimePassword, issue_one_time_password, sign_challenge, authenticate_challenge
+from apps.users.sms import SMSError
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Get user model
@@ -41,45 +44,38 @@ class UserSignupLoginView(View):
     def post(request: HttpRequest) -> HttpResponse | HttpResponseRedirect:
         """
         Get data from login form and redirect to the password confirm page
-        or render login page again
+        (render it with signed challenge in a hidden field in challenge mode) or render login page again
         Args:
             request: HttpRequest from user
         Returns:
             - HttpResponseRedirect 302 with password confirm page if data is valid
+            - HttpResponse 200 with password confirm page if data is valid in challenge mode
             - HttpResponse 200 with login page if data is not valid
         """
         user_signup_login_form: Form = UserSignupLoginForm(data=request.POST)
 
         if user_signup_login_form.is_valid():
             phone_number: str = user_signup_login_form.cleaned_data['phone_number']
-            request.session['phone_number'] = phone_number
 
-            user: User = User.objects.filter(phone_number=phone_number).first()
-            one_time_password: str = User.generate_one_time_password()
-            request.session['one_time_password'] = one_time_password
-
-            if user:
-                user.set_password(one_time_password)
-                user.save(update_fields=('password',))
+            try:
+                one_time_password: OneTimePassword = issue_one_time_password(phone_number)
+            except SMSError:
+                user_signup_login_form.add_error(None, 'SMS could not be sent')
             else:
-                new_user: User = User.objects.create(
-                    phone_number=phone_number,
-                    password=one_time_password
-                )
-                new_user.set_password(one_time_password)
-                new_user.generate_invite_code()
-                new_user.save(
-                    update_fields=(
-                        'password', 'invite_code'
+                if settings.OTP_CHALLENGE_MODE:
+                    # The challenge carries the phone number, so it is kept out of URLs
+                    return render(
+                        request,
+                        'authorize_form.html',
+                        {'challenge': sign_challenge(phone_number, one_time_password.nonce)}
                     )
-                )
 
-            # SMS send imitation
-            send_sms(one_time_password)
+                request.session['phone_number'] = phone_number
+                request.session['one_time_password'] = one_time_password.password
 
-            response: HttpResponseRedirect = redirect(reverse('user-authenticate'))
+                response: HttpResponseRedirect = redirect(reverse('user-authenticate'))
 
-            return response
+                return response
 
         return render(
             request,
@@ -125,14 +121,18 @@ class UserAuthenticationView(View):
         user_authentication_form = UserAuthenticationForm(data=request.POST)
 
         if user_authentication_form.is_valid():
-            saved_phone_number: str = request.session.get('phone_number')
             password: str = user_authentication_form.cleaned_data['password']
-
-            user: User = authenticate(
-                request,
-                phone_number=saved_phone_number,
-                password=password
-            )
+            challenge: str = user_authentication_form.cleaned_data['challenge']
+
+            with span('auth.authenticate'):
+                if challenge:
+                    user: User | None = authenticate_challenge(request, challenge, password)
+                else:
+                    user = authenticate(
+                        request,
+                        phone_number=request.session.get('phone_number'),
+                        password=password
+                    )
 
             if user:
                 login(request, user)
@@ -222,10 +222,7 @@ class UserConfirmInviteView(View):
             if User.objects.filter(
                     invite_code=invite_code
             ).exists() and not invite_code == user.invite_code:
-                user.invited_by_code = invite_code
-                user.save(
-                    update_fields=('invited_by_code',)
-                )
+                user.redeem_invite_code(invite_code)
 
         return redirect(reverse('user-profile'))
 
@@ -1,3 +1,280 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.auth import get_user_model
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.forms import ModelForm
+from django.http import HttpRequest, HttpResponse, Http404
+from django.urls import path, reverse, URLPattern
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.html import format_html, format_html_join
 
-# Register your models here.
+# ----------------------------------------------------------------------------------------------------------------------
+# Get user model
+User = get_user_model()
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Query parameter with the last shown user id of the changelist
+CURSOR_VAR: str = 'cursor'
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create paginators and changelists
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator which does not count the whole table: the number of rows of an unfiltered PostgreSQL table
+    is taken from the planner statistics, filtered rows are counted up to a limit
+    """
+    count_limit: int = 1000
+
+    @cached_property
+    def counted(self) -> tuple[int, str]:
+        """
+        Count rows
+        Returns:
+            number of rows and its text for the changelist ("~12345", "1000+" or exact number)
+        """
+        queryset: QuerySet = self.object_list
+
+        if not queryset.query.where:
+            connection = connections[queryset.db]
+            if connection.vendor != 'postgresql':
+                total: int = queryset.count()
+                return total, str(total)
+
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                    [queryset.model._meta.db_table]
+                )
+                estimate: int = cursor.fetchone()[0]
+            # Never analyzed tables have no estimate
+            if estimate > self.count_limit:
+                return estimate, f'~{estimate}'
+
+        count: int = queryset[:self.count_limit + 1].count()
+        if count > self.count_limit:
+            return count, f'{self.count_limit}+'
+
+        return count, str(count)
+
+    @property
+    def count(self) -> int:
+        return self.counted[0]
+
+
+# ------------------------------------------------------------------------------
+class KeysetChangeList(ChangeList):
+    """
+    ChangeList paginated by the last shown primary key (?cursor=<id>) instead of OFFSET,
+    the model admin must be ordered by -pk
+    """
+
+    def get_filters_params(self, params: dict | None = None) -> dict:
+        lookup_params: dict = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+
+        return lookup_params
+
+    def get_results(self, request: HttpRequest) -> None:
+        """
+        Get one page of results after the cursor and the link to the next page
+        Args:
+            request: HTTP request
+        """
+        cursor: str = request.GET.get(CURSOR_VAR, '')
+        queryset: QuerySet = self.queryset
+        if cursor.isdigit():
+            queryset = queryset.filter(pk__lt=int(cursor))
+
+        # One extra row tells whether there is a next page
+        result_list: list = list(queryset[:self.list_per_page + 1])
+        has_next: bool = len(result_list) > self.list_per_page
+        result_list = result_list[:self.list_per_page]
+
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.result_count, self.result_count_display = self.paginator.counted
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.result_list = result_list
+        self.can_show_all = False
+        self.multi_page = has_next or bool(cursor)
+
+        self.first_page_url = self.get_query_string(remove=[CURSOR_VAR]) if cursor else None
+        self.next_page_url = self.get_query_string({CURSOR_VAR: result_list[-1].pk}) if has_next else None
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create model admins
+@admin.register(User)
+class UserAdmin(admin.ModelAdmin):
+    """
+    Admin of users which stays fast on large tables: estimated counts, keyset pagination,
+    indexed search and lazily loaded referrals.
+    Changes bump profile versions (profile_updated_at) of the user and its inviter, so profile ETags are renewed
+    """
+    list_display = ('id', 'phone_number', 'invite_code', 'invited_by_code', 'date_joined', 'last_login')
+    list_display_links = ('id', 'phone_number')
+    # Search is done on the indexed fields only, see get_search_results
+    search_fields = ('phone_number', 'invite_code')
+    search_help_text = 'Exact or prefix match of a phone number or an invite code'
+    # Keyset pagination needs the fixed order
+    ordering = ('-pk',)
+    sortable_by = ()
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    fields = (
+        'phone_number', 'invite_code', 'invited_by_code', 'referrals',
+        'first_name', 'last_name', 'email',
+        'is_active', 'is_staff', 'is_superuser',
+        'date_joined', 'last_login', 'profile_updated_at',
+    )
+    # Invite codes are changed only through the invite code redemption which keeps profile versions in sync
+    readonly_fields = (
+        'invite_code', 'invited_by_code', 'referrals', 'date_joined', 'last_login', 'profile_updated_at'
+    )
+
+    # Invited users loaded per request of the referral list
+    referrals_per_page: int = 100
+
+    class Media:
+        js = ('users/admin/referrals.js',)
+
+    def get_changelist(self, request: HttpRequest, **kwargs) -> type[ChangeList]:
+        return KeysetChangeList
+
+    def get_search_results(self, request: HttpRequest, queryset: QuerySet, search_term: str) -> tuple[QuerySet, bool]:
+        """
+        Case sensitive prefix search which uses the unique indexes (varchar_pattern_ops ones on PostgreSQL).
+        Phone numbers may be searched without the leading "+"
+        Args:
+            request: HTTP request
+            queryset: users
+            search_term: search string from the changelist
+        Returns:
+            filtered users and False (no duplicates)
+        """
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+
+        phone_number: str = search_term if search_term.startswith('+') else f'+{search_term}'
+        condition: Q = Q(phone_number__startswith=phone_number)
+        if not search_term.startswith('+'):
+            condition |= Q(invite_code__startswith=search_term)
+
+        return queryset.filter(condition), False
+
+    def save_model(self, request: HttpRequest, user: User, form: ModelForm, change: bool) -> None:
+        """
+        Save the user, new users get an unusable password (they log in with one time passwords) and an invite code
+        Args:
+            request: HTTP request
+            user: user instance
+            form: user form
+            change: True if the user exists
+        """
+        user.profile_updated_at = timezone.now()
+
+        if not change:
+            user.set_unusable_password()
+            user.generate_invite_code()
+            return
+
+        super().save_model(request, user, form, change)
+
+        # Inviter's profile lists phone numbers of the invited users
+        if 'phone_number' in form.changed_data and user.invited_by_code:
+            self._bump_inviters({user.invited_by_code})
+
+    def delete_model(self, request: HttpRequest, user: User) -> None:
+        super().delete_model(request, user)
+
+        if user.invited_by_code:
+            self._bump_inviters({user.invited_by_code})
+
+    def delete_queryset(self, request: HttpRequest, queryset: QuerySet) -> None:
+        codes: set[str] = set(
+            queryset.filter(invited_by_code__isnull=False).values_list('invited_by_code', flat=True)
+        )
+        super().delete_queryset(request, queryset)
+
+        self._bump_inviters(codes)
+
+    @staticmethod
+    def _bump_inviters(invite_codes: set[str]) -> None:
+        """
+        Bump profile versions of the users who own the invite codes
+        Args:
+            invite_codes: invite codes of the inviters
+        """
+        if invite_codes:
+            User.objects.filter(invite_code__in=invite_codes).update(profile_updated_at=timezone.now())
+
+    def get_urls(self) -> list[URLPattern]:
+        return [
+            path(
+                '<int:object_id>/referrals/',
+                self.admin_site.admin_view(self.referrals_view),
+                name='users_user_referrals'
+            ),
+            *super().get_urls(),
+        ]
+
+    @admin.display(description='Invited users')
+    def referrals(self, user: User) -> str:
+        """
+        Get collapsed list of the invited users, it is loaded only when opened
+        Args:
+            user: user instance
+        Returns:
+            HTML with the list placeholder
+        """
+        if not user.pk:
+            return '-'
+
+        return format_html(
+            '<details data-referrals-url="{}"><summary>Show</summary></details>',
+            reverse('admin:users_user_referrals', args=(user.pk,))
+        )
+
+    def referrals_view(self, request: HttpRequest, object_id: int) -> HttpResponse:
+        """
+        Get one page of the invited users as HTML fragment
+        Args:
+            request: HTTP request with optional "after" id
+            object_id: inviter id
+        Returns:
+            HttpResponse 200 with the list and the link to the next page
+        """
+        user: User | None = self.get_object(request, str(object_id))
+        if user is None or not self.has_view_permission(request, user):
+            raise Http404
+
+        invited_users: QuerySet = User.objects.filter(invited_by_code=user.invite_code).order_by('pk')
+        after: str = request.GET.get('after', '')
+        if after.isdigit():
+            invited_users = invited_users.filter(pk__gt=int(after))
+
+        rows: list[tuple] = list(invited_users.values_list('pk', 'phone_number')[:self.referrals_per_page + 1])
+        has_next: bool = len(rows) > self.referrals_per_page
+        rows = rows[:self.referrals_per_page]
+
+        html: str = format_html(
+            '<ul>{}</ul>',
+            format_html_join(
+                '', '<li><a href="{}">{}</a></li>',
+                ((reverse('admin:users_user_change', args=(pk,)), phone_number) for pk, phone_number in rows)
+            )
+        ) if rows else 'None'
+
+        if has_next:
+            html += format_html(
+                '<a href="{}?after={}" data-referrals-more>Show more</a>',
+                reverse('admin:users_user_referrals', args=(user.pk,)), rows[-1][0]
+            )
+
+        return HttpResponse(html)
@@ -0,0 +1,53 @@
+from typing import Iterable, Iterator
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Get user model
+User = get_user_model()
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Fields of the looked up rows in order
+LOOKUP_FIELDS: tuple[str, ...] = ('id', 'phone_number', 'invite_code', 'invited_by_code')
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create services
+def _chunks(values: list, size: int) -> Iterator[list]:
+    """
+    Split values into chunks
+    Args:
+        values: values to split
+        size: maximum chunk size
+    Returns:
+        iterator over chunks
+    """
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def lookup_users(
+        ids: Iterable[int] = (),
+        phone_numbers: Iterable[str] = (),
+        invite_codes: Iterable[str] = ()
+) -> Iterator[tuple]:
+    """
+    Look up users by ids, phone numbers and invite codes with one IN query per chunk of keys.
+    Rows are fetched lazily chunk by chunk, each user is returned once
+    Args:
+        ids: user ids
+        phone_numbers: user phone numbers
+        invite_codes: user invite codes
+    Returns:
+        iterator over rows with LOOKUP_FIELDS values
+    """
+    seen: set[int] = set()
+    keys: dict[str, Iterable] = {'pk': ids, 'phone_number': phone_numbers, 'invite_code': invite_codes}
+
+    for field, values in keys.items():
+        for chunk in _chunks(list(dict.fromkeys(values)), settings.USER_LOOKUP_CHUNK_SIZE):
+            for row in User.objects.filter(**{f'{field}__in': chunk}).values_list(*LOOKUP_FIELDS):
+                if row[0] not in seen:
+                    seen.add(row[0])
+                    yield row
@@ -0,0 +1,164 @@
+import gzip
+import json
+import time
+from datetime import datetime, timedelta
+from typing import IO
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX, make_password
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Get models
+User = get_user_model()
+RecycledInviteCode = apps.get_model('users', 'RecycledInviteCode')
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create commands
+class Command(BaseCommand):
+    """
+    Delete never authenticated accounts and clear their stale one time passwords in bounded batches
+    """
+    help = 'Delete (or archive and delete) accounts which never authenticated and clear their stale one time passwords'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--days', type=int, default=settings.USER_RETENTION_DAYS,
+                            help='delete accounts without activity for this number of days')
+        parser.add_argument('--batch-size', type=int, default=settings.USER_RETENTION_BATCH_SIZE)
+        parser.add_argument('--delay', type=float, default=settings.USER_RETENTION_BATCH_DELAY,
+                            help='pause between batches in seconds')
+        parser.add_argument('--archive', help='append deleted accounts as JSON lines to the file (.gz is compressed)')
+        parser.add_argument('--dry-run', action='store_true', help='only count matching rows')
+
+    def handle(self, *args, **options) -> None:
+        """
+        Purge unverified accounts, then clear stale credentials
+        """
+        now: datetime = timezone.now()
+        cutoff: datetime = now - timedelta(days=options['days'])
+        # The credential must outlive the cached copy reused within the resend cooldown
+        otp_cutoff: datetime = now - timedelta(
+            seconds=max(settings.OTP_CREDENTIAL_TTL, settings.OTP_RESEND_COOLDOWN)
+        )
+
+        # last_login is set by django.contrib.auth on the first login, a fresh one time password postpones the purge.
+        # Staff accounts (ex. created with createsuperuser) are never purged and keep their real passwords
+        unverified: QuerySet = User.objects.filter(
+            last_login__isnull=True,
+            date_joined__lt=cutoff,
+            is_staff=False,
+        ).filter(Q(otp_issued_at__isnull=True) | Q(otp_issued_at__lt=cutoff))
+        # The password hash is part of the session auth hash, so it is replaced only for accounts without sessions
+        stale: QuerySet = User.objects.filter(
+            last_login__isnull=True,
+            otp_issued_at__lt=otp_cutoff,
+            is_staff=False,
+        ).exclude(password__startswith=UNUSABLE_PASSWORD_PREFIX)
+
+        if options['dry_run']:
+            self.stdout.write(f'{unverified.count()} unverified accounts, {stale.count()} stale one time passwords')
+            return
+
+        archive: IO | None = None
+        if options['archive']:
+            opener = gzip.open if options['archive'].endswith('.gz') else open
+            archive = opener(options['archive'], 'at')
+
+        try:
+            deleted, recycled = self._purge(unverified, archive, options['batch_size'], options['delay'])
+        finally:
+            if archive:
+                archive.close()
+
+        cleared: int = self._clear(stale, options['batch_size'], options['delay'])
+
+        self.stdout.write(
+            f'Deleted {deleted} unverified accounts, recycled {recycled} invite codes, '
+            f'cleared {cleared} stale one time passwords'
+        )
+
+    @staticmethod
+    def _purge(unverified: QuerySet, archive: IO | None, batch_size: int, delay: float) -> tuple[int, int]:
+        """
+        Delete accounts batch by batch and return their unreferenced invite codes to the pool
+        Args:
+            unverified: accounts to delete
+            archive: file for deleted accounts or None
+            batch_size: accounts per transaction
+            delay: pause between batches in seconds
+        Returns:
+            number of deleted accounts and recycled invite codes
+        """
+        deleted: int = 0
+        recycled: int = 0
+
+        while True:
+            rows: list[dict] = list(
+                unverified.order_by('date_joined').values(
+                    'pk', 'phone_number', 'invite_code', 'date_joined'
+                )[:batch_size]
+            )
+            if not rows:
+                break
+
+            pks: list[int] = [row['pk'] for row in rows]
+
+            with transaction.atomic():
+                # Conditions are checked again, the account may have authenticated since the select
+                unverified.filter(pk__in=pks).delete()
+                remaining: set[int] = set(User.objects.filter(pk__in=pks).values_list('pk', flat=True))
+                rows = [row for row in rows if row['pk'] not in remaining]
+
+                codes: set[str] = {row['invite_code'] for row in rows if row['invite_code']}
+                # A code someone has redeemed stays retired, otherwise its new owner would inherit the invitees
+                codes -= set(
+                    User.objects.filter(invited_by_code__in=codes).values_list('invited_by_code', flat=True)
+                )
+                RecycledInviteCode.objects.bulk_create(
+                    (RecycledInviteCode(code=code) for code in codes), ignore_conflicts=True
+                )
+
+                if archive:
+                    for row in rows:
+                        archive.write(json.dumps({**row, 'date_joined': row['date_joined'].isoformat()}) + '\n')
+
+            deleted += len(rows)
+            recycled += len(codes)
+
+            # Short transactions and a pause leave room for the login path
+            time.sleep(delay)
+
+        return deleted, recycled
+
+    @staticmethod
+    def _clear(stale: QuerySet, batch_size: int, delay: float) -> int:
+        """
+        Replace expired one time password hashes with an unusable password batch by batch
+        Args:
+            stale: never authenticated accounts with expired one time passwords
+            batch_size: accounts per update
+            delay: pause between batches in seconds
+        Returns:
+            number of cleared passwords
+        """
+        cleared: int = 0
+        unusable_password: str = make_password(None)
+
+        while True:
+            pks: list[int] = list(stale.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+
+            cleared += stale.filter(pk__in=pks).update(
+                password=unusable_password, otp_issued_at=None, otp_nonce=''
+            )
+
+            time.sleep(delay)
+
+        return cleared
@@ -0,0 +1,60 @@
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand, CommandParser
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create commands
+class Command(BaseCommand):
+    """
+    Run local fake SMS provider with configurable latency and errors
+    """
+    help = 'Run local fake SMS provider (POST {"messages": [{"to": ..., "text": ...}]})'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8025)
+        parser.add_argument('--latency', type=float, default=0.1, help='response latency in seconds')
+        parser.add_argument('--jitter', type=float, default=0, help='random extra latency in seconds')
+        parser.add_argument('--error-rate', type=float, default=0, help='share of requests answered with HTTP 500')
+
+    def handle(self, *args, **options) -> None:
+        """
+        Serve fake provider API until interrupted
+        """
+        stdout = self.stdout
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self) -> None:
+                body: dict = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                time.sleep(options['latency'] + random.uniform(0, options['jitter']))
+
+                if random.random() < options['error_rate']:
+                    status, payload = 500, {'status': 'error'}
+                else:
+                    status, payload = 200, {'status': 'ok', 'sent': len(body.get('messages', []))}
+                    for message in body.get('messages', []):
+                        stdout.write(f'SMS to {message.get("to")}: {message.get("text")}')
+
+                response: bytes = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(response)))
+                self.end_headers()
+                self.wfile.write(response)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        server = ThreadingHTTPServer((options['host'], options['port']), Handler)
+        self.stdout.write(f'Fake SMS provider on http://{options["host"]}:{options["port"]}/send')
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
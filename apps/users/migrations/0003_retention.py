@@ -0,0 +1,28 @@
+# Generated by Django 4.2.4 on 2026-10-19 02:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_profile_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecycledInviteCode',
+            fields=[
+                ('code', models.CharField(max_length=6, primary_key=True, serialize=False)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='otp_issued_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('last_login__isnull', True)), fields=['date_joined'], name='users_unverified_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.4 on 2026-10-19 03:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_retention'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='invited_by_code',
+            field=models.CharField(db_index=True, max_length=6, null=True),
+        ),
+    ]
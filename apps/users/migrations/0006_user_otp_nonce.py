@@ -0,0 +1,18 @@
+# Generated by Django 4.2.4 on 2026-10-19 03:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_user_manager'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='otp_nonce',
+            field=models.CharField(blank=True, default='', max_length=16),
+        ),
+    ]
@@ -1,8 +1,52 @@
 import random
 import string
 
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.core.tracing import span
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create managers
+class UserManager(BaseUserManager):
+    """
+    Manager of users identified by phone number (used by createsuperuser)
+    """
+    use_in_migrations = True
+
+    def create_user(self, phone_number: str, password: str | None = None, **extra_fields) -> 'User':
+        """
+        Create a user with an invite code
+        Args:
+            phone_number: user phone number
+            password: raw password or None for unusable password
+            **extra_fields: other model fields
+        Returns:
+             created user
+        """
+        user: User = self.model(phone_number=phone_number, **extra_fields)
+        user.set_password(password)
+        user.generate_invite_code()
+
+        return user
+
+    def create_superuser(self, phone_number: str, password: str | None = None, **extra_fields) -> 'User':
+        """
+        Create a staff user with all permissions
+        Args:
+            phone_number: user phone number
+            password: raw password
+            **extra_fields: other model fields
+        Returns:
+             created user
+        """
+        extra_fields.setdefault('is_staff', True)
+        extra_fields.setdefault('is_superuser', True)
+
+        return self.create_user(phone_number, password, **extra_fields)
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -12,11 +56,61 @@ class User(AbstractUser):
     password = models.CharField(max_length=256)
     phone_number = models.CharField(unique=True, max_length=12)
     invite_code = models.CharField(unique=True, max_length=6)
-    invited_by_code = models.CharField(max_length=6, null=True)
+    invited_by_code = models.CharField(max_length=6, null=True, db_index=True)
+    # Version stamp of the profile payload (own codes and list of invited users)
+    profile_updated_at = models.DateTimeField(default=timezone.now)
+    # Time the current one time password was issued (last_login stays null until the first authentication)
+    otp_issued_at = models.DateTimeField(null=True)
+    # Nonce of the current one time password, signed challenges are bound to it
+    otp_nonce = models.CharField(max_length=16, blank=True, default='')
+
+    objects = UserManager()
 
     USERNAME_FIELD = 'phone_number'
     REQUIRED_FIELDS = []
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Never authenticated accounts by age, used by the retention job
+            models.Index(fields=('date_joined',), condition=Q(last_login__isnull=True), name='users_unverified_idx'),
+        ]
+
+    def set_password(self, raw_password: str | None) -> None:
+        """
+        Hash and set the password
+        Args:
+            raw_password: password from user
+        Returns:
+             None
+        """
+        with span('password.hash'):
+            super().set_password(raw_password)
+
+    def check_password(self, raw_password: str) -> bool:
+        """
+        Check the password against the hash
+        Args:
+            raw_password: password from user
+        Returns:
+             True if password is correct
+        """
+        with span('password.check'):
+            return super().check_password(raw_password)
+
+    def redeem_invite_code(self, invite_code: str) -> None:
+        """
+        Save the invite code given by other user and bump profile version of both users
+        Args:
+            invite_code: invite code of the other user
+        Returns:
+             None
+        """
+        self.invited_by_code = invite_code
+        self.profile_updated_at = timezone.now()
+        self.save(update_fields=('invited_by_code', 'profile_updated_at'))
+
+        User.objects.filter(invite_code=invite_code).update(profile_updated_at=self.profile_updated_at)
+
     @staticmethod
     def generate_one_time_password() -> str:
         """
@@ -28,10 +122,45 @@ class User(AbstractUser):
 
     def generate_invite_code(self) -> None:
         """
-        Generate random code using letters and digits and save it in user instance
+        Take a recycled invite code or generate random code using letters and digits and save it in user instance
         Returns:
              None
         """
-        chars: str = string.ascii_letters + string.digits
-        self.invite_code = ''.join(random.choice(chars) for _ in range(6))
+        invite_code: str | None = RecycledInviteCode.take()
+
+        if not invite_code:
+            chars: str = string.ascii_letters + string.digits
+            invite_code = ''.join(random.choice(chars) for _ in range(6))
+
+        self.invite_code = invite_code
         self.save()
+
+
+# ------------------------------------------------------------------------------
+class RecycledInviteCode(models.Model):
+    """
+    Invite code released by a purged account and free to be given to a new user
+    """
+    code = models.CharField(primary_key=True, max_length=6)
+
+    # Codes taken per attempt, concurrent takers race for the same rows
+    TAKE_ATTEMPTS = 3
+
+    @classmethod
+    def take(cls) -> str | None:
+        """
+        Remove one code from the pool and return it
+        Returns:
+             invite code or None if the pool is empty
+        """
+        for _ in range(cls.TAKE_ATTEMPTS):
+            code: str | None = cls.objects.values_list('code', flat=True).first()
+            if code is None:
+                return None
+
+            # Whoever deletes the row owns the code
+            deleted, _ = cls.objects.filter(code=code).delete()
+            if deleted:
+                return code
+
+        return None
@@ -0,0 +1,175 @@
+import math
+import secrets
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.contrib.auth import get_user_model, authenticate
+from django.core import signing
+from django.core.cache import cache
+from django.http import HttpRequest
+from django.utils import timezone
+
+from apps.users.sms import SMSError
+from apps.users.tasks import send_sms
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Get user model
+User = get_user_model()
+
+# Salt of the signed challenges
+CHALLENGE_SALT: str = 'users.otp.challenge'
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create data classes
+@dataclass(frozen=True)
+class OneTimePassword:
+    """
+    Issued one time password
+    """
+    password: str
+    cooldown: int
+    reused: bool
+    nonce: str
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create services
+def get_cache_key(phone_number: str) -> str:
+    """
+    Get cache key of the issued one time password
+    Args:
+        phone_number: user phone number
+    Returns:
+        string with cache key
+    """
+    return f'otp:{phone_number}'
+
+
+def _get_issued(phone_number: str) -> OneTimePassword | None:
+    """
+    Get still valid one time password issued within the resend cooldown.
+    Entries without nonce (written before challenges) are not reused
+    Args:
+        phone_number: user phone number
+    Returns:
+        issued one time password or None
+    """
+    issued: dict | None = cache.get(get_cache_key(phone_number))
+
+    if issued and issued.get('nonce'):
+        cooldown: int = math.ceil(issued['expires_at'] - time.time())
+        if cooldown > 0:
+            return OneTimePassword(
+                password=issued['password'], cooldown=cooldown, reused=True, nonce=issued['nonce']
+            )
+
+    return None
+
+
+def issue_one_time_password(phone_number: str) -> OneTimePassword:
+    """
+    Issue one time password for the phone number (create a user if it does not exist) and send it by SMS.
+    Password issued within the resend cooldown is reused without hashing, database writes and SMS
+    Args:
+        phone_number: user phone number
+    Returns:
+        issued one time password with remaining cooldown in seconds or raise SMSError
+    """
+    issued: OneTimePassword | None = _get_issued(phone_number)
+    if issued:
+        return issued
+
+    cooldown: int = settings.OTP_RESEND_COOLDOWN
+    one_time_password: str = User.generate_one_time_password()
+    nonce: str = secrets.token_urlsafe(12)
+    entry: dict = {'password': one_time_password, 'expires_at': time.time() + cooldown, 'nonce': nonce}
+
+    # Only one concurrent request issues a new password. The backend may still hold an entry after its expires_at
+    # (memcached expires in whole seconds) or an entry of an older release, such entry is removed and added once more
+    for _ in range(2):
+        if cache.add(get_cache_key(phone_number), entry, timeout=cooldown):
+            break
+
+        issued = _get_issued(phone_number)
+        if issued:
+            return issued
+
+        cache.delete(get_cache_key(phone_number))
+    else:
+        raise SMSError('One time password is being issued by a concurrent request')
+
+    try:
+        user: User = User.objects.filter(phone_number=phone_number).first()
+
+        if user:
+            user.set_password(one_time_password)
+            user.otp_issued_at = timezone.now()
+            user.otp_nonce = nonce
+            user.save(update_fields=('password', 'otp_issued_at', 'otp_nonce'))
+        else:
+            new_user: User = User.objects.create(
+                phone_number=phone_number,
+                password=one_time_password,
+                otp_issued_at=timezone.now(),
+                otp_nonce=nonce
+            )
+            new_user.set_password(one_time_password)
+            new_user.generate_invite_code()
+            new_user.save(
+                update_fields=(
+                    'password', 'invite_code'
+                )
+            )
+    except Exception:
+        cache.delete(get_cache_key(phone_number))
+        raise
+
+    try:
+        send_sms(phone_number, one_time_password)
+    except SMSError:
+        # Let the user request a new password right away
+        cache.delete(get_cache_key(phone_number))
+        raise
+
+    return OneTimePassword(password=one_time_password, cooldown=cooldown, reused=False, nonce=nonce)
+
+
+def sign_challenge(phone_number: str, nonce: str) -> str:
+    """
+    Sign stateless challenge which binds the phone number to the nonce of the issued one time password
+    Args:
+        phone_number: user phone number
+        nonce: nonce of the issued one time password
+    Returns:
+        string with signed and timestamped challenge
+    """
+    return signing.dumps({'phone_number': phone_number, 'nonce': nonce}, salt=CHALLENGE_SALT)
+
+
+def authenticate_challenge(request: HttpRequest, challenge: str, password: str) -> User | None:
+    """
+    Authenticate user by signed challenge and one time password without session or cache reads.
+    The password can be used with the challenge once
+    Args:
+        request: HTTP request
+        challenge: challenge from sign_challenge()
+        password: one time password from user
+    Returns:
+        authenticated user or None
+    """
+    try:
+        payload: dict = signing.loads(challenge, salt=CHALLENGE_SALT, max_age=settings.OTP_CHALLENGE_MAX_AGE)
+    except signing.BadSignature:
+        return None
+
+    user: User | None = authenticate(request, phone_number=payload['phone_number'], password=password)
+
+    # Consume the nonce: a challenge of an older password or a replayed one does not match
+    if user and User.objects.filter(pk=user.pk, otp_nonce=payload['nonce']).update(otp_nonce=''):
+        # The next login issues a new password instead of reusing the consumed one
+        cache.delete(get_cache_key(user.phone_number))
+        return user
+
+    return None
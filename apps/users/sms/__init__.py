@@ -0,0 +1,34 @@
+from functools import lru_cache
+
+from django.conf import settings
+
+from apps.users.sms.exceptions import SMSError
+from apps.users.sms.gateway import SMSGateway
+from apps.users.sms.providers import HTTPProvider
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Get gateway
+@lru_cache(maxsize=1)
+def get_gateway() -> SMSGateway | None:
+    """
+    Build SMS gateway from SMS_PROVIDERS setting once per process
+    Returns:
+        SMS gateway or None if no providers are configured
+    """
+    if not settings.SMS_PROVIDERS:
+        return None
+
+    providers: list[HTTPProvider] = [
+        HTTPProvider(
+            failure_threshold=settings.SMS_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.SMS_BREAKER_RESET_TIMEOUT,
+            **provider,
+        )
+        for provider in settings.SMS_PROVIDERS
+    ]
+
+    return SMSGateway(providers, hedge_delay=settings.SMS_HEDGE_DELAY)
+
+
+__all__ = ['SMSError', 'SMSGateway', 'HTTPProvider', 'get_gateway']
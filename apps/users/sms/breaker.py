@@ -0,0 +1,61 @@
+import threading
+import time
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create circuit breakers
+class CircuitBreaker:
+    """
+    Circuit breaker for the SMS provider.
+    Opens after consecutive failures and lets one trial call through after the reset timeout
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self.failure_threshold: int = failure_threshold
+        self.reset_timeout: float = reset_timeout
+        self._failures: int = 0
+        self._opened_at: float | None = None
+        self._trial: bool = False
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """
+        Check that calls are rejected
+        Returns:
+            True if the breaker is open and the reset timeout is not over
+        """
+        return self._opened_at is not None and time.monotonic() - self._opened_at < self.reset_timeout
+
+    def allow(self) -> bool:
+        """
+        Check that a call is allowed (only one trial call in the half-open state)
+        Returns:
+            True if the call is allowed
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self.is_open or self._trial:
+                return False
+
+            self._trial = True
+            return True
+
+    def record_success(self) -> None:
+        """
+        Close the breaker after successful call
+        """
+        with self._lock:
+            self._failures, self._opened_at, self._trial = 0, None, False
+
+    def record_failure(self) -> None:
+        """
+        Count failed call and open the breaker after the threshold
+        """
+        with self._lock:
+            self._failures += 1
+            self._trial = False
+
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
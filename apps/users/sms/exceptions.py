@@ -0,0 +1,6 @@
+# ----------------------------------------------------------------------------------------------------------------------
+# Create exceptions
+class SMSError(Exception):
+    """
+    SMS could not be sent
+    """
@@ -0,0 +1,62 @@
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from apps.users.sms.exceptions import SMSError
+from apps.users.sms.providers import HTTPProvider
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Get logger
+logger = logging.getLogger(__name__)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create gateways
+class SMSGateway:
+    """
+    SMS gateway over several providers (in priority order).
+    Skips providers with open circuit breaker and hedges the send to the next provider
+    if the current one has not answered within the hedge delay
+    """
+
+    def __init__(self, providers: list[HTTPProvider], hedge_delay: float, max_workers: int = 20) -> None:
+        self.providers: list[HTTPProvider] = providers
+        self.hedge_delay: float = hedge_delay
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='sms')
+
+    def send(self, phone_number: str, text: str) -> str:
+        """
+        Send message with hedging. Raises SMSError right away if every breaker is open
+        Args:
+            phone_number: recipient phone number
+            text: message text
+        Returns:
+            name of the provider which has sent the message or raise SMSError
+        """
+        providers: list[HTTPProvider] = list(self.providers)
+        pending: dict[Future, HTTPProvider] = {}
+        errors: list[str] = []
+
+        while providers or pending:
+            # Start the next provider if nothing is in flight or the hedge delay is over,
+            # providers with open breaker are skipped
+            if providers:
+                provider: HTTPProvider = providers.pop(0)
+                if provider.breaker.allow():
+                    pending[self._executor.submit(provider.send, phone_number, text)] = provider
+
+            if not pending:
+                continue
+
+            done, _ = wait(pending, timeout=self.hedge_delay if providers else None, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    future.result()
+                except SMSError as error:
+                    logger.warning('SMS provider failed: %s', error)
+                    errors.append(str(error))
+                else:
+                    return provider.name
+
+        raise SMSError('; '.join(errors) or 'No SMS provider available')
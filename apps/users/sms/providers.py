@@ -0,0 +1,115 @@
+import http.client
+import json
+import queue
+from urllib.parse import urlsplit
+
+from apps.users.sms.breaker import CircuitBreaker
+from apps.users.sms.exceptions import SMSError
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Create providers
+class HTTPProvider:
+    """
+    SMS provider with HTTP JSON API and a pool of keep-alive connections.
+    API: POST <url> {"messages": [{"to": "+79991234567", "text": "..."}]} -> 2xx
+    """
+
+    def __init__(
+            self,
+            name: str,
+            url: str,
+            token: str = '',
+            timeout: float = 5,
+            pool_size: int = 10,
+            failure_threshold: int = 5,
+            reset_timeout: float = 30,
+    ) -> None:
+        self.name: str = name
+        self.token: str = token
+        self.timeout: float = timeout
+        self.breaker: CircuitBreaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        url_parts = urlsplit(url)
+        self._connection_class = http.client.HTTPSConnection if url_parts.scheme == 'https' else http.client.HTTPConnection
+        self._netloc: str = url_parts.netloc
+        self._path: str = url_parts.path or '/'
+        self._pool: queue.LifoQueue = queue.LifoQueue(maxsize=pool_size)
+
+    def __repr__(self) -> str:
+        return f'<HTTPProvider {self.name}>'
+
+    def _get_connection(self) -> http.client.HTTPConnection:
+        """
+        Get idle connection from the pool or open a new one
+        Returns:
+            HTTP connection
+        """
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return self._connection_class(self._netloc, timeout=self.timeout)
+
+    def _release_connection(self, connection: http.client.HTTPConnection) -> None:
+        """
+        Return connection to the pool or close it if the pool is full
+        Args:
+            connection: HTTP connection
+        """
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def _request(self, connection: http.client.HTTPConnection, body: bytes, headers: dict) -> http.client.HTTPResponse:
+        """
+        Make API request and read the response
+        Args:
+            connection: HTTP connection
+            body: request body
+            headers: request headers
+        Returns:
+            HTTP response with read body
+        """
+        connection.request('POST', self._path, body=body, headers=headers)
+        response: http.client.HTTPResponse = connection.getresponse()
+        response.read()
+
+        return response
+
+    def send(self, phone_number: str, text: str) -> None:
+        """
+        Send one message
+        Args:
+            phone_number: recipient phone number
+            text: message text
+        Returns:
+            None or raise SMSError
+        """
+        body: bytes = json.dumps({'messages': [{'to': phone_number, 'text': text}]}).encode()
+        headers: dict = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+
+        connection: http.client.HTTPConnection = self._get_connection()
+        try:
+            try:
+                response: http.client.HTTPResponse = self._request(connection, body, headers)
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # Idle keep-alive connection was closed by the provider, retry once with a new one
+                connection.close()
+                response = self._request(connection, body, headers)
+        except (OSError, http.client.HTTPException) as error:
+            connection.close()
+            self.breaker.record_failure()
+            raise SMSError(f'{self.name}: {error}') from error
+
+        if response.will_close:
+            connection.close()
+        self._release_connection(connection)
+
+        if not 200 <= response.status < 300:
+            self.breaker.record_failure()
+            raise SMSError(f'{self.name}: HTTP {response.status}')
+
+        self.breaker.record_success()
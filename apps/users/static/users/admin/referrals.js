@@ -0,0 +1,26 @@
+'use strict';
+{
+    // Invited users are loaded only when the list is opened, by pages
+    async function loadReferrals(container, url) {
+        const response = await fetch(url, {credentials: 'same-origin'});
+        container.insertAdjacentHTML('beforeend', await response.text());
+    }
+
+    document.addEventListener('toggle', function(event) {
+        const details = event.target;
+        if (details.dataset && details.dataset.referralsUrl && details.open && !details.dataset.loaded) {
+            details.dataset.loaded = 'true';
+            loadReferrals(details, details.dataset.referralsUrl);
+        }
+    }, true);
+
+    document.addEventListener('click', function(event) {
+        const link = event.target.closest('a[data-referrals-more]');
+        if (link) {
+            event.preventDefault();
+            const container = link.parentElement;
+            link.remove();
+            loadReferrals(container, link.href);
+        }
+    });
+}
@@ -1,16 +1,27 @@
 import time
 
+from apps.core.tracing import span
+from apps.users.sms import SMSGateway, get_gateway
+
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Create tasks
-def send_sms(one_time_password: str) -> str:
+def send_sms(phone_number: str, one_time_password: str) -> str:
     """
-    SMS imitation for the task (ex. Celery)
+    Send one time password with SMS gateway or imitate it if no providers are configured (ex. Celery)
     Args:
+        phone_number: recipient phone number
         one_time_password: generated one time password
     Returns:
-        string with 'Success' status
+        string with 'Success' status or raise SMSError
     """
-    time.sleep(2)
-    print(f'OTP: {one_time_password}')
-    return 'Success'
+    gateway: SMSGateway | None = get_gateway()
+
+    with span('sms.send', imitation=gateway is None):
+        if gateway is None:
+            time.sleep(2)
+            print(f'OTP: {one_time_password}')
+            return 'Success'
+
+        gateway.send(phone_number, f'OTP: {one_time_password}')
+        return 'Success'
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_asgi_application()
+
+# Prime the worker before it serves the first request
+from apps.core.warmup import warm_up  # noqa: E402
+
+warm_up()
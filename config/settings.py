@@ -38,19 +38,25 @@ THIRD_PARTY_APPS = [
 LOCAL_APPS = [
     'users.apps.UsersConfig',
     'api.apps.ApiConfig',
+    'core.apps.CoreConfig',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 # Set middleware classes for the project
 MIDDLEWARE = [
+    'apps.core.middleware.CompressionMiddleware',
+    'apps.core.middleware.StaticFilesMiddleware',
+    'apps.core.tracing.TracingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.core.middleware.ProfilingMiddleware',
 ]
 
 # Set the project's root URL configuration
@@ -59,7 +65,7 @@ ROOT_URLCONF = 'config.urls'
 # Set the project's templates
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'apps.core.tracing.TracingDjangoTemplates',
         'DIRS': [Path(BASE_DIR, 'apps', 'frontend', 'users', 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -78,6 +84,11 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 # Set database configuration
 DATABASES = {'default': env.db()}
+DATABASES['default']['CONN_MAX_AGE'] = env.int('CONN_MAX_AGE', default=60)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+# Templates compiled on worker warm-up
+WARM_UP_TEMPLATES = ['login_form.html', 'authorize_form.html', 'profile_form.html']
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -107,6 +118,32 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR.joinpath('static')
+STATICFILES_DIRS = [BASE_DIR.joinpath('apps', 'frontend', 'users', 'static')]
+
+# Content-hashed file names and .gz/.br copies are written on collectstatic
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'apps.core.storage.CompressedManifestStaticFilesStorage'},
+}
+STATIC_COMPRESS_MIN_SIZE = 512
+STATIC_MAX_AGE = 60
+STATIC_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+# Response compression (brotli if installed and accepted, gzip otherwise)
+COMPRESSION_MIN_SIZE = env.int('COMPRESSION_MIN_SIZE', default=512)
+COMPRESSION_BROTLI_QUALITY = env.int('COMPRESSION_BROTLI_QUALITY', default=5)
+
+# Third-party assets downloaded with "python manage.py vendor_static" and checked against the SHA-256 sums
+# of VENDOR_STATIC_CHECKSUMS ("python manage.py vendor_static --pin" writes them for new versions).
+# Templates use the CDN URLs for assets which are not committed into VENDOR_STATIC_DIR
+VENDOR_STATIC_DIR = BASE_DIR.joinpath('apps', 'frontend', 'users', 'static')
+VENDOR_STATIC_CHECKSUMS = BASE_DIR.joinpath('vendor_static.sha256')
+VENDOR_STATIC_ASSETS = {
+    'vendor/uikit/uikit.min.css': 'https://cdn.jsdelivr.net/npm/uikit@3.16.24/dist/css/uikit.min.css',
+    'vendor/uikit/uikit.min.js': 'https://cdn.jsdelivr.net/npm/uikit@3.16.24/dist/js/uikit.min.js',
+    'vendor/uikit/uikit-icons.min.js': 'https://cdn.jsdelivr.net/npm/uikit@3.16.24/dist/js/uikit-icons.min.js',
+    'vendor/jquery/jquery.min.js': 'https://code.jquery.com/jquery-3.7.0.min.js',
+}
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -119,12 +156,63 @@ AUTHENTICATION_BACKENDS = (
     'django.contrib.auth.backends.ModelBackend',
 )
 
+# Cache settings (use a shared cache, e.g. redis, with several workers)
+CACHES = {'default': env.cache('CACHE_URL', default='locmemcache://')}
+
+# One time password settings
+OTP_RESEND_COOLDOWN = env.int('OTP_RESEND_COOLDOWN', default=60)
+IDEMPOTENCY_KEY_TIMEOUT = env.int('IDEMPOTENCY_KEY_TIMEOUT', default=60 * 60)
+# Challenge mode: /login returns a signed challenge for /authenticate instead of saving the phone number in session
+OTP_CHALLENGE_MODE = env.bool('OTP_CHALLENGE_MODE', default=False)
+OTP_CHALLENGE_MAX_AGE = env.int('OTP_CHALLENGE_MAX_AGE', default=10 * 60)
+# Seconds after which an issued one time password is cleared by the retention job
+OTP_CREDENTIAL_TTL = env.int('OTP_CREDENTIAL_TTL', default=60 * 60)
+
+# Retention of never authenticated accounts (purge_unverified_users)
+USER_RETENTION_DAYS = env.int('USER_RETENTION_DAYS', default=30)
+USER_RETENTION_BATCH_SIZE = env.int('USER_RETENTION_BATCH_SIZE', default=500)
+USER_RETENTION_BATCH_DELAY = env.float('USER_RETENTION_BATCH_DELAY', default=0.2)
+
+# Internal services allowed to call internal endpoints, ex. SERVICE_TOKENS=billing=<token>,notifications=<token>
+SERVICE_TOKENS = env.dict('SERVICE_TOKENS', default={})
+# Bulk user lookup: maximum keys per request and keys per IN query
+USER_LOOKUP_MAX_ITEMS = env.int('USER_LOOKUP_MAX_ITEMS', default=5000)
+USER_LOOKUP_CHUNK_SIZE = env.int('USER_LOOKUP_CHUNK_SIZE', default=500)
+
+# SMS gateway settings. Providers in priority order, ex.
+# SMS_PROVIDERS=[{"name": "fake", "url": "http://localhost:8025/send"}]
+# Without providers SMS sending is imitated
+SMS_PROVIDERS = env.json('SMS_PROVIDERS', default=[])
+SMS_HEDGE_DELAY = env.float('SMS_HEDGE_DELAY', default=0.5)
+SMS_BREAKER_FAILURE_THRESHOLD = env.int('SMS_BREAKER_FAILURE_THRESHOLD', default=5)
+SMS_BREAKER_RESET_TIMEOUT = env.float('SMS_BREAKER_RESET_TIMEOUT', default=30)
+
+# On-demand request profiling (python manage.py profiling_token / profile_report)
+PROFILING_ENABLED = env.bool('PROFILING_ENABLED', default=False)
+PROFILING_DIR = env.str('PROFILING_DIR', default=str(BASE_DIR.joinpath('profiles')))
+PROFILING_MAX_PER_MINUTE = env.int('PROFILING_MAX_PER_MINUTE', default=6)
+PROFILING_TOKEN_MAX_AGE = env.int('PROFILING_TOKEN_MAX_AGE', default=60 * 60)
+
+# Request tracing: traces are written as OTLP JSON lines to TRACING_FILE
+# or sent to TRACING_OTLP_ENDPOINT (ex. http://localhost:4318/v1/traces)
+TRACING_ENABLED = env.bool('TRACING_ENABLED', default=False)
+TRACING_FILE = env.str('TRACING_FILE', default=str(BASE_DIR.joinpath('traces.jsonl')))
+TRACING_OTLP_ENDPOINT = env.str('TRACING_OTLP_ENDPOINT', default='')
+TRACING_SERVICE_NAME = env.str('TRACING_SERVICE_NAME', default='hammer-systems')
+# Traces waiting for export (new ones are dropped when it is full) and traces sent per request to the collector
+TRACING_QUEUE_SIZE = env.int('TRACING_QUEUE_SIZE', default=1000)
+TRACING_BATCH_SIZE = env.int('TRACING_BATCH_SIZE', default=100)
+
 # Session settings
 SESSION_ENGINE = 'django.contrib.sessions.backends.db'
 
 # Rest framework settings
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": [
+        "apps.api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
 }
 
 # Spectacular settings
@@ -138,3 +226,8 @@ SPECTACULAR_SETTINGS = {
     },
     "SERVE_INCLUDE_SCHEMA": False
 }
+
+# Serve schema from the file built with "python manage.py spectacular --file schema.yml"
+# instead of generating it in the request path (the Docker image builds the file and turns it on)
+SCHEMA_PREBUILT = env.bool('SCHEMA_PREBUILT', default=False)
+SCHEMA_FILE = BASE_DIR.joinpath('schema.yml')
@@ -14,13 +14,14 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-# from django.contrib import admin
+from django.contrib import admin
 from django.urls import path, include
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Create urls
 urlpatterns = [
-    # path('admin/', admin.site.urls),
+    path('admin/', admin.site.urls),
+    path('', include('apps.core.urls')),
     path('api/', include('apps.api.urls')),
     path('', include('apps.frontend.users.urls')),
 ]